@@ -1,9 +1,12 @@
 from .branch import Branch
 from .constants import STOP_CONSTANT
 from .default.assign_results import assign
-from .default.parallelism import check_sequence_lengths, set_val_for_all, add_sequences, \
-    create_init_data_sequence, thread_pool, update_br_name, parallelize_without_result, parallelize_with_result_return
+from .default.executors import AimdController, ConcurrencyGovernor, ExecutorRegistry, executor_registry
+from .default.parallelism import check_sequence_lengths, check_threads, set_val_for_all, add_sequences, \
+    create_init_data_sequence, thread_pool, thread_pool_as_completed, update_br_name, parallelize_without_result, \
+    parallelize_with_result_return, parallelize_as_completed
 from .default.rw_classes import Values, Variables
+from .execution_plan import BranchPlan
 from .default.stubs import get_all_args_return_default_value, raise_err_if_none_received
 from .launch_operations.errors import IncorrectParameterError, EmptyBranchError, EmptyDataError, \
     DistributionError, RemainingArgsFoundError, AssignmentError
@@ -13,11 +16,12 @@ from .utils.formatters import LoggerBuilder, error_formatter
 
 
 __all__ = [
-    "Branch", "STOP_CONSTANT", "assign", "Values", "Variables",
-    "check_sequence_lengths", "add_sequences",
+    "Branch", "BranchPlan", "STOP_CONSTANT", "assign", "Values", "Variables",
+    "AimdController", "ConcurrencyGovernor", "ExecutorRegistry", "executor_registry",
+    "check_sequence_lengths", "check_threads", "add_sequences",
     "set_val_for_all", "create_init_data_sequence",
-    "thread_pool", "update_br_name", "parallelize_without_result",
-    "parallelize_with_result_return", "get_all_args_return_default_value",
+    "thread_pool", "thread_pool_as_completed", "update_br_name", "parallelize_without_result",
+    "parallelize_with_result_return", "parallelize_as_completed", "get_all_args_return_default_value",
     "raise_err_if_none_received", "IncorrectParameterError",
     "EmptyBranchError", "EmptyDataError", "DistributionError",
     "RemainingArgsFoundError", "AssignmentError", "Operation",
@@ -1,17 +1,12 @@
-from typing import Any, Dict, Optional, Tuple, Union
+from dataclasses import replace
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from .constants import STOP_CONSTANT
-from .launch_operations.data_parsing import ResultParser
-from .launch_operations.errors import EmptyDataError, IncorrectParameterError, EmptyBranchError, \
-    RemainingArgsFoundError
+from .execution_plan import BranchPlan, CallPool, OperationStep
+from .initialization_core import TypeCheckGate
+from .launch_operations.errors import DistributionError, EmptyBranchError
+from .launch_operations.step_dependencies import StepAccess
 from .utils.common import to_tuple
-from .launch_operations.rw_inst_updater import RwInstUpdater
-from .operation import Operation, CallObject, Assigner, OptionsChecker
-from .utils.common import renew_def_rw_inst
-from .utils.formatters import LoggerBuilder
-
-
-log = LoggerBuilder().build()
+from .operation import Operation, CallObject, OptionsChecker
 
 
 BranchType = Union[Operation, "Branch", CallObject, Tuple[
@@ -19,9 +14,13 @@ BranchType = Union[Operation, "Branch", CallObject, Tuple[
 
 
 class Branch:
+    __slots__ = ("_operations", "_br_name", "_def_args", "_assign", "_all_operations_must_be_executed",
+                 "_hide_init_inf_from_logs", "_check_type_strategy_all", "_type_check_mode",
+                 "_raise_err_if_empty_data", "_distribute_input_data", "_dag_mode", "_dag_workers",
+                 "_rw_inst_from_option", "_type_check_gates", "_call_pools")
+
     def __init__(self, br_name: str = None) -> None:
         self._operations: Optional[Tuple] = None
-        self._current_operation: Optional[Union[Branch, Operation]] = None
 
         self._br_name: Optional[str] = None
         self.set_br_name(br_name)
@@ -30,17 +29,15 @@ class Branch:
         self._all_operations_must_be_executed: Optional[bool] = None
         self._hide_init_inf_from_logs: Optional[bool] = None
         self._check_type_strategy_all: Optional[bool] = None
+        self._type_check_mode: Optional[Tuple[str, Optional[Union[int, float]]]] = None
         self._raise_err_if_empty_data: bool = False
         self._distribute_input_data: bool = False
+        self._dag_mode: bool = False
+        self._dag_workers: Optional[int] = None
 
-        self._rw_inst: Optional[Dict[str, Any]] = None
         self._rw_inst_from_option: Optional[Dict[str, Any]] = None
-
-        self._branch_stack = "INITIAL RUN"
-        self._operation_stack = "INITIAL RUN"
-        self._last_op_stack = "INITIAL RUN"
-        self._is_it_operation = False
-        self._delayed_return = None
+        self._type_check_gates: Dict[Tuple, TypeCheckGate] = {}
+        self._call_pools: Dict[Union[int, str], CallPool] = {}
 
     def def_args(self, *def_args: Tuple[Any, ...]) -> "Branch":
         self._def_args = def_args
@@ -66,6 +63,29 @@ class Branch:
         self._check_type_strategy_all = value
         return self
 
+    def type_check_mode(self, mode: str, value: Optional[Union[int, float]] = None) -> "Branch":
+        """full (default), first_run (value = number of checked runs, 1 by default),
+        sampled (value = fraction of checked runs) or off. Inherited by nested
+        branches and operations. Each operation of the branch counts its own runs,
+        the counters are kept by the branch, so they go on across Branch.run calls
+        and plans compiled from it."""
+        self._type_check_mode = (mode, value)
+        return self
+
+    def dag_mode(self, workers: Optional[int] = None) -> "Branch":
+        """Run the operations of the branch that do not depend on each other concurrently.
+
+        The call of an operation with the assign option is run on a pool of workers
+        threads (by default one per operation), the next operations go on at once.
+        An operation waits only for the calls that assign or get the whole objects
+        its links ("val.x") refer to. Nested branches, distributions and operations
+        with rw_inst wait for all calls. Arguments are bound in the declared order,
+        the first error in the declared order is raised. Not inherited by nested branches.
+        """
+        self._dag_mode = True
+        self._dag_workers = workers
+        return self
+
     @property
     def distribute_input_data(self) -> "Branch":
         self._distribute_input_data = True
@@ -76,6 +96,179 @@ class Branch:
         self._raise_err_if_empty_data = True
         return self
 
+    def compile(self) -> BranchPlan:
+        """Build an immutable plan of the branch which can be run many times.
+
+        Operations are wrapped, names and stacks are resolved and static
+        options are validated once. The branch itself is not consumed.
+        """
+        plan, _ = self._compile(None, "INITIAL RUN", False, False, True, None)
+        return plan
+
+    def _compile(
+            self,
+            parent_stack: Optional[str],
+            last_op_stack: str,
+            all_operations_must_be_executed: bool,
+            hide_init_inf_from_logs: bool,
+            check_type_strategy_all: bool,
+            type_check_mode: Optional[Tuple[str, Optional[Union[int, float]]]]) -> Tuple[BranchPlan, str]:
+        if not self._operations:
+            raise EmptyBranchError(
+                f"Operation: INITIAL RUN.\n"
+                f"Running a branch without operations is impossible.")
+        if self._all_operations_must_be_executed is not None:
+            all_operations_must_be_executed = self._all_operations_must_be_executed
+        if self._hide_init_inf_from_logs is not None:
+            hide_init_inf_from_logs = self._hide_init_inf_from_logs
+        if self._check_type_strategy_all is not None:
+            check_type_strategy_all = self._check_type_strategy_all
+        branch_stack = self._br_name if parent_stack is None \
+            else f"{parent_stack} -> {self._br_name}"
+        if self._type_check_mode is not None:
+            type_check_mode = OptionsChecker.check_type_check_mode(
+                f"{branch_stack}(branch)", self._type_check_mode)
+
+        OptionsChecker.check_name(self._br_name, last_op_stack)
+        steps = []
+        parallel_distributions = {}
+        for num, operation in enumerate(self._operations):
+            if not isinstance(operation, (Branch, Operation, CallObject)):
+                raise TypeError(
+                    f"Last successful operation: {last_op_stack}.\n"
+                    f"Processing object can be only Branch, Operation, CallObject.")
+            if isinstance(operation, CallObject):
+                operation = Operation(operation)
+
+            if isinstance(operation, Operation):
+                step = Branch._compile_operation(
+                    operation, branch_stack, last_op_stack,
+                    hide_init_inf_from_logs, check_type_strategy_all, type_check_mode)
+                gate = self._type_check_gates.setdefault(
+                    (num, step.type_check.mode, step.type_check.value), step.type_check)
+                step = replace(step, type_check=gate)
+                last_op_stack = step.operation_stack
+                if operation._parallel_distribution:
+                    parallel_distributions[len(steps)] = operation._distribution_workers
+            else:
+                step, last_op_stack = operation._compile(
+                    branch_stack, last_op_stack, all_operations_must_be_executed,
+                    hide_init_inf_from_logs, check_type_strategy_all, type_check_mode)
+            steps.append(step)
+        if parallel_distributions:
+            self._add_distribution_pools(steps, parallel_distributions)
+        call_pool = None
+        if self._dag_mode:
+            OptionsChecker.check_distribution_workers(f"{branch_stack}(branch)", self._dag_workers)
+            call_pool = self._get_call_pool(
+                "dag_mode", len(steps) if self._dag_workers is None else self._dag_workers)
+            Branch._add_step_access(steps)
+        assign_paths = OptionsChecker.get_assign_paths(last_op_stack, self._assign)
+
+        return BranchPlan(
+            br_name=self._br_name,
+            branch_stack=branch_stack,
+            steps=tuple(steps),
+            def_args=self._def_args,
+            assign=assign_paths,
+            rw_inst=self._rw_inst_from_option,
+            all_operations_must_be_executed=all_operations_must_be_executed,
+            hide_init_inf_from_logs=hide_init_inf_from_logs,
+            check_type_strategy_all=check_type_strategy_all,
+            type_check_mode=type_check_mode,
+            distribute_input_data=self._distribute_input_data,
+            raise_err_if_empty_data=self._raise_err_if_empty_data,
+            call_pool=call_pool), last_op_stack
+
+    @staticmethod
+    def _add_step_access(steps: List[Union[OperationStep, BranchPlan]]) -> None:
+        """Describe the fields the operations access, the dag mode schedules them by it."""
+        for num, step in enumerate(steps):
+            if isinstance(step, OperationStep) and step.rw_inst is None and not (
+                    step.distribute_input_data or step.stop_distribution):
+                steps[num] = replace(step, access=StepAccess.from_call(step.call, step.assign))
+
+    def _get_call_pool(self, key: Union[int, str], workers: int) -> CallPool:
+        """Return the pool of the step (or of the dag mode), it is kept between compiles
+        while the number of workers is the same."""
+        pool = self._call_pools.get(key)
+        if pool is None or pool.workers != workers:
+            pool = self._call_pools[key] = CallPool(workers)
+        return pool
+
+    def _add_distribution_pools(
+            self,
+            steps: List[Union[OperationStep, BranchPlan]],
+            parallel_distributions: Dict[int, Optional[int]]) -> None:
+        """Give one pool to the operations from a parallel distribution to its stop."""
+        pool = None
+        for num, step in enumerate(steps):
+            if pool is None and num in parallel_distributions:
+                end = next((end for end in range(num, len(steps)) if isinstance(
+                    steps[end], OperationStep) and steps[end].stop_distribution), len(steps) - 1)
+                for distributed in steps[num:end + 1]:
+                    if isinstance(distributed, BranchPlan):
+                        raise DistributionError(
+                            f"Operation: {step.operation_stack}.\n"
+                            f"Only operations can be distributed in parallel,\n"
+                            f"but the branch {distributed.branch_stack} was found before the stop.")
+                workers = parallel_distributions[num]
+                pool = self._get_call_pool(num, end - num + 1 if workers is None else workers)
+            if pool is not None:
+                steps[num] = replace(step, distribution_pool=pool)
+                if num == end:
+                    pool = None
+
+    @staticmethod
+    def _compile_operation(
+            operation: Operation,
+            branch_stack: str,
+            last_op_stack: str,
+            hide_init_inf_from_logs: bool,
+            check_type_strategy_all: bool,
+            type_check_mode: Optional[Tuple[str, Optional[Union[int, float]]]]) -> OperationStep:
+        OptionsChecker.check_name(operation._op_name, last_op_stack)
+        call = operation._obj._get_call_spec()
+        op_name = operation._op_name
+        name_from_instance = False
+        if op_name is None or op_name.startswith("External instance from string"):
+            op_name = operation._obj._get_entity_name()
+            name_from_instance = isinstance(call.instance, str)
+        operation_stack = f"{branch_stack} -> {op_name}"
+
+        OptionsChecker.check_burn_rem_args_op(
+            operation_stack, operation._burn_rem_args,
+            operation._distribute_input_data)
+        OptionsChecker.check_stop_distribution(
+            operation_stack, operation._stop_distribution,
+            operation._distribute_input_data)
+        OptionsChecker.check_distribution_workers(
+            operation_stack, operation._distribution_workers)
+
+        if operation._hide_init_inf_from_logs is not None:
+            hide_init_inf_from_logs = operation._hide_init_inf_from_logs
+        if operation._check_type_strategy_all is not None:
+            check_type_strategy_all = operation._check_type_strategy_all
+        if operation._type_check_mode is not None:
+            type_check_mode = operation._type_check_mode
+
+        return OperationStep(
+            call=call,
+            op_name=op_name,
+            branch_stack=branch_stack,
+            operation_stack=operation_stack,
+            name_from_instance=name_from_instance,
+            def_args=operation._def_args,
+            assign=OptionsChecker.get_assign_paths(operation_stack, operation._assign),
+            rw_inst=operation._rw_inst_from_option,
+            hide_init_inf_from_logs=hide_init_inf_from_logs,
+            check_type_strategy_all=check_type_strategy_all,
+            type_check=OptionsChecker.get_type_check_gate(operation_stack, type_check_mode),
+            distribute_input_data=operation._distribute_input_data,
+            stop_distribution=operation._stop_distribution,
+            burn_rem_args=operation._burn_rem_args,
+            raise_err_if_empty_data=operation._raise_err_if_empty_data)
+
     def get_br_name(self) -> str:
         return self._br_name
 
@@ -83,219 +276,57 @@ class Branch:
         self._br_name = "BRANCH NAME NOT DEFINED" \
             if br_name is None else br_name
 
-    def _renew_def_rw_inst(self):
-        self._rw_inst = renew_def_rw_inst(self._operation_stack, self._rw_inst)
-
-    def _get_current_operation(self) -> None:
-        if self._operations:
-            self._current_operation = self._operations[0]
-            if not any([
-                isinstance(self._current_operation, Branch),
-                isinstance(self._current_operation, Operation),
-                isinstance(self._current_operation, CallObject)]):
-                raise TypeError(
-                    f"Last successful operation: {self._last_op_stack}.\n"
-                    f"Processing object can be only Branch, Operation, CallObject.")
-
-            if isinstance(self._current_operation, CallObject):
-                self._current_operation = Operation(self._current_operation)
-
-            self._is_it_operation = True if isinstance(
-                self._current_operation, Operation) else False
-
-            self._operations = None if len(
-                self._operations) == 1 else self._operations[1:]
-        else:
-            raise EmptyBranchError(
-                f"Operation: {self._operation_stack}.\n"
-                f"Running a branch without operations is impossible.")
-
-    def _get_curr_op_params(self):
-        self._def_args = self._current_operation._def_args
-        self._raise_err_if_empty_data = self._current_operation._raise_err_if_empty_data
-
     def __getitem__(self, operations: BranchType) -> "Branch":
         operations = to_tuple(operations)
         self._operations = operations
+        self._type_check_gates = {}
+        self._call_pools = {}
         return self
 
     def __call__(self, *args: BranchType, **kwargs) -> "Branch":
         if self._operations is None:
             args = to_tuple(args)
             self._operations = args
+            self._type_check_gates = {}
+            self._call_pools = {}
         return self
 
-    def _set_branch_stack(self, stack: str = None):
-        if self._br_name is None:
-            self._br_name = "BRANCH NAME NOT DEFINED"
-        if stack is not None:
-            self._branch_stack = f"{stack} -> {self._br_name}"
-
-    def _set_last_op_stack(self, stack: str) -> None:
-        self._last_op_stack = stack
-
-    def _set_rw_inst(self, rw_inst: Dict[str, Any]) -> None:
-        self._rw_inst = rw_inst
-
-    def _update_rw_inst(self, rw_inst: Dict[str, Any]) -> None:
-        self._rw_inst = RwInstUpdater.get_updated(
-            self._operation_stack, self._rw_inst, rw_inst)
-
-    def _get_initial_run_params(self, input_data: Optional[Any] = None) -> Optional[Any]:
-        if input_data is None and self._branch_stack == \
-                "INITIAL RUN" and self._def_args is None:
-            input_data = ()
-        if self._branch_stack == "INITIAL RUN":
-            self._branch_stack = self._br_name
-            if self._all_operations_must_be_executed is None:
-                self._all_operations_must_be_executed = False
-            if self._hide_init_inf_from_logs is None:
-                self._hide_init_inf_from_logs = False
-            if self._check_type_strategy_all is None:
-                self._check_type_strategy_all = True
-        return input_data
-
-    def _end_branch_check(
-            self, stop_operations: Optional[bool] = None) -> None:
-        if stop_operations and self._all_operations_must_be_executed:
-            raise IncorrectParameterError(
-                f'\nOperation: {self._operation_stack}.\n'
-                f'The previous operation returned the constant\n'
-                f'"stop_all_further_operations_with_success_result"\n'
-                f'meaning a forced stop of all further operations,\n'
-                f'but it was found that the current branch has the\n'
-                f'option all_operations_must_be_executed=True applied.\n'
-                f'Combining these factors is impossible.')
-        elif self._all_operations_must_be_executed:
-            raise EmptyDataError(
-                f"Operation: {self._operation_stack}.\n"
-                f"The data was not received when all operations were\n"
-                f"scheduled to be performed.")
-        elif self._raise_err_if_empty_data and not stop_operations:
-            raise EmptyDataError(
-                f"Operation: {self._operation_stack}.\n"
-                f"No data was received. An exception was raised,\n"
-                f"according to the Operation/Branch.raise_err_if_empty_data flag set.")
-
     def run(self, input_data: Optional[Any] = None) -> Optional[Any]:
-        self._get_current_operation()
-        self._get_curr_op_params()
-        input_data = self._get_initial_run_params(input_data)
-        OptionsChecker.check_name(self._br_name, self._last_op_stack)
-        self._set_branch_stack()
-        if self._is_it_operation:
-            self._current_operation._set_last_op_stack(self._last_op_stack)
-            self._current_operation._set_branch_stack(self._branch_stack)
-            self._current_operation._check_name()
-            self._operation_stack = self._current_operation._update_stack()
-            OptionsChecker.check_burn_rem_args_br(
-                self._operation_stack,
-                self._current_operation._burn_rem_args,
-                self._current_operation._stop_distribution,
-                self._delayed_return)
-        else:
-            self._current_operation._set_last_op_stack(self._last_op_stack)
-            self._operation_stack = f"{self._branch_stack}(branch)"
-
-        self._update_rw_inst(self._rw_inst_from_option)
-
-        if input_data is None and self._def_args is not None:
-            input_data = self._def_args
-        elif input_data is None and self._def_args is None:
-            self._end_branch_check()
-            return None
-        sd, self._rw_inst = ResultParser.sort_data(to_tuple(input_data), self._rw_inst)
-        if sd.stop_all_operations:
-            self._end_branch_check(
-                sd.stop_all_operations)
-            log.info(
-                f'Operation: {self._operation_stack}.\n'
-                f'The operation returned the constant '
-                f'"stop_all_further_operations_with_success_result"\n'
-                f'meaning forced stop of all further operations. '
-                f'The branch will return this constant as a result.')
-            return STOP_CONSTANT
-        input_data = sd.data
-
-        if self._is_it_operation:
-            self._current_operation._update_rw_inst(self._rw_inst)
-            self._operation_stack = self._current_operation._get_op_stack()
-            if self._current_operation._hide_init_inf_from_logs is None:
-                self._current_operation._hide_init_inf_from_logs = self._hide_init_inf_from_logs
-            if self._current_operation._check_type_strategy_all is None:
-                self._current_operation._check_type_strategy_all = self._check_type_strategy_all
-
-            result, rem_args = self._current_operation.run(input_data)
-
-            if self._operations is None and self._delayed_return is not None:
-                self._current_operation._stop_distribution = True
-
-            if self._delayed_return is not None and not \
-                    self._current_operation._stop_distribution or self._distribute_input_data:
-                self._distribute_input_data = False
-                self._current_operation._distribute_input_data = True
-
-            if self._current_operation._distribute_input_data and not self._delayed_return:
-                self._delayed_return = to_tuple(result)
-                result = () if rem_args is None else rem_args
-            elif self._delayed_return:
-                self._delayed_return = (*self._delayed_return, *to_tuple(result))
-                result = () if rem_args is None else rem_args
-            if self._current_operation._stop_distribution:
-                result = self._delayed_return[0] if len(
-                    self._delayed_return) == 1 else self._delayed_return
-                self._delayed_return = None
-
-            if rem_args is not None and not any([
-                self._delayed_return is not None,
-                self._distribute_input_data]):
-                rem_args_hidden = [type(arg) for arg in rem_args]
-                raise RemainingArgsFoundError(
-                    f"Operation: {self._operation_stack}.\n"
-                    f"After executing the operation, data was detected that was not involved\n"
-                    f"in the initialization/call. Len {len(rem_args)}; Their types: {rem_args_hidden}\n"
-                    f"If this is planned, use the burn_rem_args option or use the distribution operation\n"
-                    f"(distributed_input_data ... stop_distribution options).\n"
-                    f"After stopping the distribution, the remaining arguments are also not allowed.")
-
-            self._set_last_op_stack(self._current_operation._get_op_stack())
-
-            if self._operations is None:
-                return result
-            result = self.run(result)
-            return result
-
-        if self._current_operation._all_operations_must_be_executed is None:
-            self._current_operation._all_operations_must_be_executed = \
-                self._all_operations_must_be_executed
-        if self._current_operation._hide_init_inf_from_logs is None:
-            self._current_operation._hide_init_inf_from_logs = \
-                self._hide_init_inf_from_logs
-        if self._current_operation._check_type_strategy_all is None:
-            self._current_operation._check_type_strategy_all = \
-                self._check_type_strategy_all
-        if self._distribute_input_data:
-            self._distribute_input_data = False
-            self._current_operation._distribute_input_data = True
-
-        self._current_operation._set_branch_stack(self._branch_stack)
-        self._current_operation._set_rw_inst(self._rw_inst)
-        self._current_operation._renew_def_rw_inst()
-
-        result = self._current_operation.run(input_data)
-        self._set_last_op_stack(self._current_operation._last_op_stack)
-
-        if self._operations is None:
-            if self._assign is not None:
-                return Assigner.do_assign(
-                    self._operation_stack, self._assign,
-                    self._rw_inst, result)
-            return result
-
-        result = self.run(result)
-        if self._assign is not None:
-            return Assigner.do_assign(
-                self._operation_stack, self._assign,
-                self._rw_inst, result)
-        return result
-
+        """Compile the branch and execute it.
+
+        Operations are executed in a loop, so the depth of the call stack
+        does not depend on the number of operations in the branch.
+        """
+        return self.compile().run(input_data)
+
+    def run_many(
+            self,
+            inputs: Iterable[Optional[Any]],
+            *,
+            ordered: bool = True,
+            workers: int = 1) -> Iterator[Optional[Any]]:
+        """Compile the branch once and run it for every input, the results are yielded lazily.
+
+        With workers > 1 the inputs are processed concurrently; ordered=False yields
+        the results as they are completed. Each run writes into its own layer of the
+        Values/Variables given by rw_inst, the given instances are not changed.
+        Other rw_inst instances are shared by the runs, with workers > 1 they must be
+        safe to use from several threads.
+        """
+        return self.compile().run_many(inputs, ordered=ordered, workers=workers)
+
+    def run_pipelined(
+            self,
+            inputs: Iterable[Optional[Any]],
+            *,
+            queue_size: int = 1) -> Iterator[Optional[Any]]:
+        """Compile the branch once and run the inputs through it as through a pipeline.
+
+        Every top-level operation (or nested branch) runs on its own thread,
+        the item k + 1 enters an operation while the item k is in the next one.
+        queue_size is the number of items that may wait between two operations.
+        The results are yielded lazily in the order of the inputs. Each item writes
+        into its own layer of the Values/Variables given by rw_inst, the given
+        instances are not changed; other rw_inst instances are shared by the items.
+        """
+        return self.compile().run_pipelined(inputs, queue_size=queue_size)
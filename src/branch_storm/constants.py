@@ -1,2 +1,3 @@
 STOP_CONSTANT = "stop_all_further_operations_with_success_result"
 PARAMETER_WAS_NOT_EXPANDED = "The parameter was not expanded."
+TYPE_CHECK_MODES = ("full", "first_run", "sampled", "off")
@@ -1,6 +1,6 @@
-from typing import Dict, Type
+from typing import Any, Dict, Iterable, Tuple
 
-from ..default.rw_classes import Variables, Values
+from ..utils.common import AttrPath, parse_attr_path
 
 
 def assign(*args, **kwargs):
@@ -9,27 +9,21 @@ def assign(*args, **kwargs):
     Returned result:
         only instances of the special classes, with new values. No pos_args will be returned.
     """
-    rw_instances: Dict[str, Type] = {}
-    args = list(args)
-    for par_str, dclass in kwargs.items():
-        splited_par = par_str.split(".")
+    return assign_to_paths(args, ((parse_attr_path(par_str), dclass) for par_str, dclass in kwargs.items()))
+
+
+def assign_to_paths(values: Tuple, targets: Iterable[Tuple[AttrPath, Any]]) -> Tuple:
+    """Same as assign, the targets are pairs of the parsed path and the instance of its alias."""
+    rw_instances: Dict[str, Any] = {}
+    values = iter(values)
+    for path, dclass in targets:
         rw_instances[dclass.__class__.__name__] = dclass
-        if len(splited_par) > 1:
-            result = dclass
-            last_rw_inst, last_field = None, None
-            for field in splited_par[1:]:
-                last_rw_inst = result
-                try:
-                    result = result.__getattribute__(field)
-                except AttributeError:
-                    if isinstance(result, Variables) or isinstance(result, Values):
-                        result = None
-                last_field = field
+        if path.fields:
             try:
-                first_value = args.pop(0)
-            except IndexError:
+                first_value = next(values)
+            except StopIteration:
                 raise ValueError("Not enough positional arguments to assign fields to special classes")
 
-            last_rw_inst.__setattr__(last_field, first_value)
+            path.set_on(dclass, first_value)
 
-    return tuple(list(rw_instances.values()))
+    return tuple(rw_instances.values())
@@ -0,0 +1,243 @@
+import atexit
+import os
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..utils.formatters import LoggerBuilder
+
+log = LoggerBuilder().build()
+
+EXECUTOR_KINDS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+DEFAULT_THREAD_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
+class ConcurrencyGovernor:
+    """Process-wide budget of the branches running in the shared executors at the same time.
+
+    Nested parallel calls draw from the same budget, so their total number of
+    workers stays within the limit instead of multiplying. Without a limit
+    (by default) only the sizes of the executors bound the branches.
+    """
+
+    def __init__(self, limit: Optional[int] = None) -> None:
+        self._lock = Lock()
+        self._used = 0
+        self.limit: Optional[int] = None
+        self.configure(limit)
+
+    def configure(self, limit: Optional[int]) -> None:
+        if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+            raise ValueError(f"The concurrency limit must be a positive int or None, passed: {limit}")
+        self.limit = limit
+
+    @property
+    def used(self) -> int:
+        return self._used
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.limit is not None and self._used >= self.limit:
+                return False
+            self._used += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._used -= 1
+
+
+@dataclass
+class ConcurrencyRound:
+    level: int
+    throughput: float
+    latency: float
+
+
+class AimdController:
+    """Number of workers for threads="auto": slow start, then additive increase, multiplicative decrease.
+
+    A round lasts until level branches are completed during the slow start and
+    until max(round_size, 2 * level) afterwards. If the average latency of the
+    round grows over latency_tolerance times the lowest one seen, or the
+    throughput falls under throughput_tolerance times the previous one after
+    an increase, the level is multiplied by decrease (downstream is overloaded)
+    and the slow start ends. Otherwise the level is doubled during the slow start
+    and increased by increase afterwards. history keeps the rounds.
+    """
+
+    def __init__(
+            self,
+            max_level: int,
+            min_level: int = 1,
+            start_level: int = 1,
+            increase: int = 1,
+            decrease: float = 0.5,
+            latency_tolerance: float = 2.0,
+            throughput_tolerance: float = 0.8,
+            round_size: int = 8,
+            clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_level = max(max_level, 1)
+        self.min_level = min(max(min_level, 1), self.max_level)
+        self.level = min(max(start_level, self.min_level), self.max_level)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.throughput_tolerance = throughput_tolerance
+        self.round_size = round_size
+        self.slow_start = True
+        self.history: List[ConcurrencyRound] = []
+        self._clock = clock
+        self._lock = Lock()
+        self._min_latency: Optional[float] = None
+        self._last_throughput: Optional[float] = None
+        self._increased = False
+        self._start_round(clock())
+
+    @property
+    def round_length(self) -> int:
+        return self.level if self.slow_start else max(self.round_size, 2 * self.level)
+
+    def _start_round(self, now: float) -> None:
+        self._round_start = now
+        self._completed = 0
+        self._latency_sum = 0.0
+
+    def record(self, latency: float) -> None:
+        """Register a completed branch and the time it took."""
+        with self._lock:
+            self._completed += 1
+            self._latency_sum += latency
+            if self._completed >= self.round_length:
+                self._end_round()
+
+    def _end_round(self) -> None:
+        now = self._clock()
+        throughput = self._completed / max(now - self._round_start, 1e-9)
+        latency = self._latency_sum / self._completed
+        self._min_latency = latency if self._min_latency is None else min(self._min_latency, latency)
+        level = self.level
+        if latency > self._min_latency * self.latency_tolerance or (
+                self._increased and throughput < self._last_throughput * self.throughput_tolerance):
+            self.level = max(self.min_level, int(level * self.decrease))
+            self.slow_start = False
+        elif self.slow_start:
+            self.level = min(self.max_level, level * 2)
+        else:
+            self.level = min(self.max_level, level + self.increase)
+        self._increased = self.level > level
+        self.history.append(ConcurrencyRound(level, throughput, latency))
+        if self.level != level:
+            log.info(f"Auto threads: {level} -> {self.level} workers "
+                     f"(throughput {throughput:.1f}/s, latency {latency * 1000:.1f} ms)")
+        self._last_throughput = throughput
+        self._start_round(now)
+
+
+class ExecutorRegistry:
+    """Named executors shared by the whole process.
+
+    An executor is created on its first use and lives until shutdown
+    (called at the interpreter exit), so parallel calls do not start and stop
+    their own threads. The "thread" and "process" executors are always registered.
+
+    executor_registry.configure("io", "thread", 64)
+    parallelize_without_result("job", branches, "max", executor="io")  # up to 64 at a time
+
+    Tasks are submitted by try_submit only while both the executor has a free
+    worker and the governor has budget. So a submitted task never waits in
+    the queue, and a worker waiting for its nested tasks cannot deadlock.
+    By default the governor has no limit of its own, the branches of all
+    executors together are bounded with limit_concurrency:
+
+    executor_registry.limit_concurrency(16)  # None removes the limit
+    """
+
+    def __init__(self, governor: Optional[ConcurrencyGovernor] = None) -> None:
+        self._lock = Lock()
+        self._configs: Dict[str, Tuple[str, int]] = {}
+        self._executors: Dict[str, Executor] = {}
+        self._running: Dict[str, int] = {}
+        self.governor = ConcurrencyGovernor() if governor is None else governor
+        self.configure("thread", "thread")
+        self.configure("process", "process")
+
+    def configure(self, name: str, kind: str = "thread", max_workers: Optional[int] = None) -> None:
+        """Register (or change) the executor, it is not possible once it is created."""
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f'The executor kind must be "thread" or "process", passed: {kind}')
+        if max_workers is None:
+            max_workers = DEFAULT_THREAD_WORKERS if kind == "thread" else os.cpu_count() or 1
+        if not isinstance(max_workers, int) or isinstance(max_workers, bool) or max_workers < 1:
+            raise ValueError(f"The number of workers must be a positive int, passed: {max_workers}")
+        with self._lock:
+            if name in self._executors:
+                raise ValueError(f'The executor "{name}" is already created, shut it down before configuring')
+            self._configs[name] = (kind, max_workers)
+
+    def limit_concurrency(self, limit: Optional[int]) -> None:
+        """Limit the number of branches running in all executors at the same time."""
+        self.governor.configure(limit)
+
+    def get_config(self, name: str) -> Tuple[str, int]:
+        try:
+            return self._configs[name]
+        except KeyError:
+            raise ValueError(f'The executor "{name}" is not registered. '
+                             f'Registered executors: {list(self._configs)}') from None
+
+    def get(self, name: str) -> Executor:
+        executor = self._executors.get(name)
+        if executor is None:
+            kind, max_workers = self.get_config(name)
+            with self._lock:
+                executor = self._executors.get(name)
+                if executor is None:
+                    executor = EXECUTOR_KINDS[kind](max_workers=max_workers)
+                    self._executors[name] = executor
+        return executor
+
+    def try_submit(self, name: str, func: Callable, *args: Any) -> Optional[Future]:
+        """Submit the task if the executor has a free worker and the budget allows, otherwise return None
+        (the caller runs the task itself)."""
+        _, max_workers = self.get_config(name)
+        executor = self.get(name)
+        with self._lock:
+            running = self._running.get(name, 0)
+            if running >= max_workers or not self.governor.try_acquire():
+                return None
+            self._running[name] = running + 1
+        try:
+            future = executor.submit(func, *args)
+        except BaseException:
+            self._release(name)
+            raise
+        future.add_done_callback(partial(self._release, name))
+        return future
+
+    def _release(self, name: str, _: Optional[Future] = None) -> None:
+        with self._lock:
+            self._running[name] -= 1
+        self.governor.release()
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executors, self._executors = self._executors, {}
+        for executor in executors.values():
+            executor.shutdown(wait=wait)
+
+    def _reset_after_fork(self) -> None:
+        # The executors of the parent process cannot be used in a forked child
+        self._lock = Lock()
+        self._executors = {}
+        self._running = {}
+        self.governor = ConcurrencyGovernor(self.governor.limit)
+
+
+executor_registry = ExecutorRegistry()
+atexit.register(executor_registry.shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=executor_registry._reset_after_fork)
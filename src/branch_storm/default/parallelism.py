@@ -1,7 +1,11 @@
-from concurrent.futures import ThreadPoolExecutor
-from typing import Any, List, Optional, Tuple, Sequence
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Sequence, Union
 
 from ..branch import Branch
+from ..launch_operations.errors import IncorrectParameterError
+from .executors import AimdController, executor_registry
 from ..utils.formatters import LoggerBuilder
 
 log = LoggerBuilder().build()
@@ -47,23 +51,140 @@ def create_init_data_sequence(
     return add_sequences(id_for_all, *idata_for_each)
 
 
+def run_branch(branch: Branch, input_data: Any) -> Any:
+    return branch.run(input_data)
+
+
+def check_threads(threads: Union[str, int]) -> Union[str, int]:
+    """Return "max", "auto" or the number of threads (a positive int or its string)."""
+    if threads in ("max", "auto"):
+        return threads
+    number = int(threads) if isinstance(threads, str) and threads.isdigit() else threads
+    if not isinstance(number, int) or isinstance(number, bool) or number < 1:
+        raise IncorrectParameterError(
+            f'The number of threads must be "max", "auto" or a positive int, passed: {threads!r}')
+    return number
+
+
 def thread_pool(
         arg_seq: Any,
         table_branches_seq: Sequence[Branch],
-        threads: str = "max") -> Tuple:
-    results = []
-    if threads == "max":
-        threads = len(arg_seq)
+        threads: str = "max",
+        executor: str = "thread") -> Tuple:
+    """Run the branches with their input data, the results are in the order of the branches.
+
+    The branches are submitted to the shared executor with the given name (see executor_registry),
+    at most threads of them at a time ("max" - as many as the executor has workers, "auto" -
+    chosen while running by AimdController from the measured throughput and latency, the
+    levels are logged). When the executor or the process-wide concurrency budget
+    (executor_registry.governor) is used up, e.g. by nested parallel calls, the call waits
+    for its own running branches or, if it has none, runs the branch in the calling thread.
+    In the "process" executor the branches, their input data and results are pickled
+    (functions and classes must be importable), changes of rw_inst objects and globals
+    made by a branch stay in its process.
+    """
+    threads = check_threads(threads)
+    futures: List[Optional[Future]] = [None] * len(arg_seq)
+    for num, future in _run_as_completed(arg_seq, table_branches_seq, threads, executor):
+        futures[num] = future
+    return tuple(future.result() for future in futures)
+
+
+def thread_pool_as_completed(
+        arg_seq: Any,
+        table_branches_seq: Sequence[Branch],
+        threads: str = "max",
+        executor: str = "thread") -> Iterator[Tuple[str, Any]]:
+    """Like thread_pool, but yield (branch name, result) as soon as each branch is finished.
+
+    The name is the one given to the branch, without the job prefix added by
+    update_br_name ("job -> table" gives "table").
+    The pool keeps no reference to a yielded result. If a branch fails, no more branches
+    are started, the running ones are waited for and the error is raised. The same
+    happens when the generator is closed before it is exhausted.
+    """
+    threads = check_threads(threads)
+    return _results_as_completed(
+        table_branches_seq, _run_as_completed(arg_seq, table_branches_seq, threads, executor))
+
+
+def _results_as_completed(
+        table_branches_seq: Sequence[Branch],
+        completed: Iterator[Tuple[int, Future]]) -> Iterator[Tuple[str, Any]]:
+    names = [branch.get_br_name().rsplit(" -> ", 1)[-1] for branch in table_branches_seq]
+    try:
+        for num, future in completed:
+            yield names[num], future.result()
+    finally:
+        completed.close()
+
+
+def _run_as_completed(
+        arg_seq: Any,
+        table_branches_seq: Sequence[Branch],
+        threads: str,
+        executor: str) -> Iterator[Tuple[int, Future]]:
+    """Submit the branches (see thread_pool) and yield (number of the branch, its future) in completion order."""
+    _, max_workers = executor_registry.get_config(executor)
+    controller = None
+    if threads == "auto":
+        controller = AimdController(min(max_workers, len(arg_seq)))
+        threads = controller.level
     else:
-        threads = int(threads)
-    with ThreadPoolExecutor(max_workers=threads) as pool:
-        for one_thread_result in pool.map(
-                lambda x: x[0].run(x[1]),
-                zip(table_branches_seq, arg_seq)):
-            results.append(one_thread_result)
-        log.info(f"ThreadPoolExecutor has finished processing in {threads} threads")
+        threads = max_workers if threads == "max" else threads
+        threads = min(threads, len(arg_seq)) or 1
+
+    running: Dict[Future, int] = {}
+    caller_runs = 0
+    try:
+        for num, (branch, input_data) in enumerate(zip(table_branches_seq, arg_seq)):
+            if controller is not None:
+                threads = controller.level
+            while len(running) >= threads:
+                yield from _pop_completed(running)
+            future = executor_registry.try_submit(executor, run_branch, branch, input_data)
+            while future is None and running:
+                # Own branches hold their workers, so waiting for them cannot deadlock
+                yield from _pop_completed(running)
+                future = executor_registry.try_submit(executor, run_branch, branch, input_data)
+            if future is None:
+                caller_runs += 1
+                started = time.monotonic()
+                future = Future()
+                try:
+                    future.set_result(run_branch(branch, input_data))
+                except Exception as exc:
+                    future.set_exception(exc)
+                if controller is not None:
+                    controller.record(time.monotonic() - started)
+                yield num, future
+            else:
+                running[future] = num
+                if controller is not None:
+                    future.add_done_callback(partial(_record_latency, controller, time.monotonic()))
+        while running:
+            yield from _pop_completed(running)
+    finally:
+        if running:
+            wait(running)
+
+    if controller is not None:
+        levels = [concurrency_round.level for concurrency_round in controller.history]
+        details = f"with auto threads, levels by rounds: {levels}"
+    else:
+        details = f"in {threads} workers"
+    log.info(f"The {executor} executor has finished processing {details}"
+             + (f", {caller_runs} branches were run by the calling thread" if caller_runs else ""))
+
+
+def _pop_completed(running: Dict[Future, int]) -> Iterator[Tuple[int, Future]]:
+    done, _ = wait(running, return_when=FIRST_COMPLETED)
+    for future in done:
+        yield running.pop(future), future
 
-    return tuple(results)
+
+def _record_latency(controller: AimdController, started: float, _: Future) -> None:
+    controller.record(time.monotonic() - started)
 
 
 def update_br_name(
@@ -85,10 +206,12 @@ def parallelize_without_result(
         table_branches_seq: Sequence[Branch],
         threads: str,
         idata_for_all: Optional[Any] = None,
-        idata_for_each: Tuple[Sequence] = None) -> None:
+        idata_for_each: Tuple[Sequence] = None,
+        executor: str = "thread") -> None:
+    threads = check_threads(threads)
     table_branches_seq = update_br_name(job_name, table_branches_seq)
     arg_seq = create_init_data_sequence(len(table_branches_seq), idata_for_all, idata_for_each)
-    thread_pool(arg_seq, table_branches_seq, threads=threads)
+    thread_pool(arg_seq, table_branches_seq, threads=threads, executor=executor)
 
 
 def parallelize_with_result_return(
@@ -96,7 +219,27 @@ def parallelize_with_result_return(
         table_branches_seq: Sequence[Branch],
         threads: str,
         idata_for_all: Optional[Any] = None,
-        idata_for_each: Tuple[Sequence] = None) -> Tuple:
+        idata_for_each: Tuple[Sequence] = None,
+        executor: str = "thread") -> Tuple:
+    threads = check_threads(threads)
+    table_branches_seq = update_br_name(job_name, table_branches_seq)
+    arg_seq = create_init_data_sequence(len(table_branches_seq), idata_for_all, idata_for_each)
+    return thread_pool(arg_seq, table_branches_seq, threads=threads, executor=executor)
+
+
+def parallelize_as_completed(
+        job_name: str,
+        table_branches_seq: Sequence[Branch],
+        threads: str,
+        idata_for_all: Optional[Any] = None,
+        idata_for_each: Tuple[Sequence] = None,
+        executor: str = "thread") -> Iterator[Tuple[str, Any]]:
+    """Yield (branch name, result) in the order the branches finish (see thread_pool_as_completed).
+
+    for table_name, result in parallelize_as_completed("Load", branches, "max"):
+        write(table_name, result)
+    """
+    threads = check_threads(threads)
     table_branches_seq = update_br_name(job_name, table_branches_seq)
     arg_seq = create_init_data_sequence(len(table_branches_seq), idata_for_all, idata_for_each)
-    return thread_pool(arg_seq, table_branches_seq, threads=threads)
+    return thread_pool_as_completed(arg_seq, table_branches_seq, threads=threads, executor=executor)
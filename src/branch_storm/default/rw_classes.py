@@ -1,4 +1,89 @@
 from dataclasses import dataclass, Field, field
+from typing import Any, Dict, Tuple, TypeVar
+
+RwInst = TypeVar("RwInst")
+
+# Attributes read through the class, fields are looked up in the instance layers only
+VARIABLES_ATTRIBUTES = frozenset([
+    '__annotations__', '__class__',
+    '__dataclass_params__', '__delattr__', '__dir__',
+    '__doc__', '__eq__', '__format__', '__ge__', '__getattribute__',
+    '__gt__', '__hash__', '__init__', '__init_subclass__', '__le__',
+    '__lt__', '__module__', '__ne__', '__new__', '__post_init__', '__reduce__',
+    '__reduce_ex__', '__repr__', '__setattr__', '__sizeof__', '__str__',
+    '__subclasshook__', '__weakref__', '_op_stack_name', '_field_registry'])
+VALUES_ATTRIBUTES = VARIABLES_ATTRIBUTES | {'_Values__check_data_structure'}
+LAYER_SLOTS = ("_field_registry", "_parent_fields", "_parent_registries")
+
+
+MAX_LAYER_DEPTH = 8
+
+
+def init_layer_slots(rw_inst: RwInst) -> RwInst:
+    # Field metadata of the written values lives on the instance, not in the class
+    object.__setattr__(rw_inst, "_field_registry", dict(type(rw_inst).__dataclass_fields__))
+    object.__setattr__(rw_inst, "_parent_fields", ())
+    object.__setattr__(rw_inst, "_parent_registries", ())
+    return rw_inst
+
+
+def new_layer(rw_inst: RwInst) -> RwInst:
+    """Return an empty instance of the same class on top of rw_inst.
+
+    Reading falls through to rw_inst, writing goes to the new layer only.
+    The dataclass __init__ is not called, the defaults of the class stay in
+    the bottom layer. Over MAX_LAYER_DEPTH layers the ancestors are merged
+    into one (later writes to them are not seen by the new layer).
+    """
+    cls = type(rw_inst)
+    layer = cls.__new__(cls)
+    parent_fields = (object.__getattribute__(rw_inst, "__dict__"),
+                     *object.__getattribute__(rw_inst, "_parent_fields"))
+    parent_registries = (object.__getattribute__(rw_inst, "_field_registry"),
+                         *object.__getattribute__(rw_inst, "_parent_registries"))
+    if len(parent_fields) > MAX_LAYER_DEPTH:
+        parent_fields = (merge_layers(parent_fields[0], parent_fields[1:]),)
+        parent_registries = (merge_layers(parent_registries[0], parent_registries[1:]),)
+    object.__setattr__(layer, "_parent_fields", parent_fields)
+    object.__setattr__(layer, "_parent_registries", parent_registries)
+    layer._op_stack_name = rw_inst._op_stack_name
+    return layer
+
+
+def restore_rw_inst(cls: type, fields: Dict[str, Any]) -> Any:
+    """Rebuild a pickled or copied instance (see reduce_rw_inst) as one layer."""
+    rw_inst = cls.__new__(cls)
+    registry = object.__getattribute__(rw_inst, "_field_registry")
+    for key, value in fields.items():
+        if key not in registry:
+            registry[key] = field(default=value)
+    object.__getattribute__(rw_inst, "__dict__").update(fields)
+    return rw_inst
+
+
+def reduce_rw_inst(rw_inst: Any) -> Tuple:
+    """The copy-on-write layers are flattened into one dict of fields.
+
+    The field metadata given with field() is not kept, the fields get their values as defaults.
+    """
+    fields = merge_layers(dict(object.__getattribute__(rw_inst, "__dict__")),
+                          object.__getattribute__(rw_inst, "_parent_fields"))
+    return restore_rw_inst, (type(rw_inst), fields)
+
+
+def has_field(rw_inst: Any, key: str) -> bool:
+    return key in object.__getattribute__(rw_inst, "__dict__") or any(
+        key in fields for fields in object.__getattribute__(rw_inst, "_parent_fields"))
+
+
+def merge_layers(own: Dict[str, Any], parents: Tuple[Dict[str, Any], ...]) -> Dict[str, Any]:
+    if not parents:
+        return own
+    merged = {}
+    for layer in reversed(parents):
+        merged.update(layer)
+    merged.update(own)
+    return merged
 
 
 @dataclass
@@ -11,21 +96,32 @@ class Values:
 
     Purpose: 1 time write then only read
     """
+    __slots__ = ("__dict__", "__weakref__", *LAYER_SLOTS)
     _op_stack_name: str = ""
 
+    def __new__(cls, *args, **kwargs):
+        # The layer slots are set before __init__, which writes the fields of subclasses
+        return init_layer_slots(object.__new__(cls))
+
+    def __reduce__(self):
+        return reduce_rw_inst(self)
+
     def __setattr__(self, key, value):
-        if key in self.__dict__ and key != "_op_stack_name":
+        if key in LAYER_SLOTS:
+            return object.__setattr__(self, key, value)
+        if key != "_op_stack_name" and has_field(self, key):
             start_mess = f"Operation: {self._op_stack_name}. " if self._op_stack_name else ""
             raise ValueError(f"{start_mess}The value cannot be overwritten. "
                              f"The class is intended for single-write and read use.")
         if isinstance(value, Field):
             dcl_field = value
             value = dcl_field.default
-            self.__dataclass_fields__[key] = dcl_field
+            self._field_registry[key] = dcl_field
         else:
             self.__check_data_structure(value)
-            self.__dataclass_fields__[key] = field(default=value)
-        self.__dict__[key] = value
+            if key not in type(self).__dataclass_fields__:
+                self._field_registry[key] = field(default=value)
+        object.__getattribute__(self, "__dict__")[key] = value
 
     def __check_data_structure(self, value) -> None:
         if any([isinstance(value, frozenset),
@@ -50,49 +146,64 @@ class Values:
                         f"bool, bytes, bytearray, memoryview.")
 
     def __getattribute__(self, item):
-        if item in [
-            '_Values__check_data_structure',
-            '__annotations__', '__class__',
-            '__dataclass_fields__', '__dataclass_params__',
-            '__delattr__', '__dict__', '__dir__', '__doc__',
-            '__eq__', '__format__', '__ge__', '__getattribute__',
-            '__gt__', '__hash__', '__init__', '__init_subclass__',
-            '__le__', '__lt__', '__module__', '__ne__', '__new__',
-            '__reduce__', '__reduce_ex__', '__repr__', '__setattr__',
-            '__sizeof__', '__str__', '__subclasshook__', '__weakref__',
-            '_op_stack_name']:
+        if item in VALUES_ATTRIBUTES:
+            return object.__getattribute__(self, item)
+        if item == "__dict__":
+            return merge_layers(object.__getattribute__(self, "__dict__"),
+                                object.__getattribute__(self, "_parent_fields"))
+        if item == "__dataclass_fields__":
+            return merge_layers(object.__getattribute__(self, "_field_registry"),
+                                object.__getattribute__(self, "_parent_registries"))
+        try:
+            return object.__getattribute__(self, "__dict__")[item]
+        except KeyError:
             pass
-        elif item not in self.__dict__:
-            start_mess = f"Operation: {self._op_stack_name}. " if self._op_stack_name else ""
-            raise AttributeError(f"{start_mess}No such attribute in Variables")
-        return super().__getattribute__(item)
+        for fields in object.__getattribute__(self, "_parent_fields"):
+            if item in fields:
+                return fields[item]
+        start_mess = f"Operation: {self._op_stack_name}. " if self._op_stack_name else ""
+        raise AttributeError(f"{start_mess}No such attribute in Variables")
 
 
 @dataclass
 class Variables:
     """Write, rewrite and read any pos_args structures."""
+    __slots__ = ("__dict__", "__weakref__", *LAYER_SLOTS)
     _op_stack_name: str = ""
 
+    def __new__(cls, *args, **kwargs):
+        # The layer slots are set before __init__, which writes the fields of subclasses
+        return init_layer_slots(object.__new__(cls))
+
+    def __reduce__(self):
+        return reduce_rw_inst(self)
+
     def __setattr__(self, key, value):
+        if key in LAYER_SLOTS:
+            return object.__setattr__(self, key, value)
         if isinstance(value, Field):
             dcl_field = value
             value = dcl_field.default
-            self.__dataclass_fields__[key] = dcl_field
-        else:
-            self.__dataclass_fields__[key] = field(default=value)
-        self.__dict__[key] = value
+            self._field_registry[key] = dcl_field
+        elif key not in type(self).__dataclass_fields__:
+            self._field_registry[key] = field(default=value)
+        object.__getattribute__(self, "__dict__")[key] = value
 
     def __getattribute__(self, item):
-        if item in [
-            '__annotations__', '__class__', '__dataclass_fields__',
-            '__dataclass_params__', '__delattr__', '__dict__', '__dir__',
-            '__doc__', '__eq__', '__format__', '__ge__', '__getattribute__',
-            '__gt__', '__hash__', '__init__', '__init_subclass__', '__le__',
-            '__lt__', '__module__', '__ne__', '__new__', '__reduce__',
-            '__reduce_ex__', '__repr__', '__setattr__', '__sizeof__', '__str__',
-            '__subclasshook__', '__weakref__', '_op_stack_name']:
+        if item in VARIABLES_ATTRIBUTES:
+            return object.__getattribute__(self, item)
+        if item == "__dict__":
+            return merge_layers(object.__getattribute__(self, "__dict__"),
+                                object.__getattribute__(self, "_parent_fields"))
+        if item == "__dataclass_fields__":
+            return merge_layers(object.__getattribute__(self, "_field_registry"),
+                                object.__getattribute__(self, "_parent_registries"))
+        try:
+            return object.__getattribute__(self, "__dict__")[item]
+        except KeyError:
             pass
-        elif item not in self.__dict__:
-            start_mess = f"Operation: {self._op_stack_name}. " if self._op_stack_name else ""
-            raise AttributeError(f"{start_mess}No such attribute in Variables")
-        return super().__getattribute__(item)
+        for fields in object.__getattribute__(self, "_parent_fields"):
+            if item in fields:
+                return fields[item]
+        start_mess = f"Operation: {self._op_stack_name}. " if self._op_stack_name else ""
+        raise AttributeError(f"{start_mess}No such attribute in Variables")
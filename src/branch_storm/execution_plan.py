@@ -0,0 +1,593 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
+from dataclasses import dataclass, field, replace
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from .constants import STOP_CONSTANT
+from .initialization_core import TypeCheckGate
+from .launch_operations.data_parsing import ResultParser
+from .launch_operations.errors import EmptyDataError, IncorrectParameterError, RemainingArgsFoundError
+from .launch_operations.rw_inst_updater import RwInstUpdater
+from .launch_operations.step_dependencies import PendingCalls, StepAccess, assigned_instances
+from .operation import Assigner, CallObject, CallSpec, OpProcessor, OptionsChecker
+from .utils.common import AttrPath, layer_rw_inst, renew_def_rw_inst, to_tuple
+from .utils.formatters import LoggerBuilder
+
+log = LoggerBuilder().build()
+
+
+class CallPool:
+    """Threads for the deferred calls of a parallel distribution or a branch in the dag mode.
+
+    The pool is kept by the Branch, so every plan compiled from it (every
+    Branch.run) uses the same threads, they are started on the first call.
+    A pickled pool is restored without threads.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = Lock()
+
+    def __reduce__(self):
+        return CallPool, (self.workers,)
+
+    def submit(self, func: Callable[[], Any]) -> Future:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="branch_storm_distribution")
+        return self._executor.submit(func)
+
+
+@dataclass(frozen=True)
+class PendingResult:
+    """Result of a distributed operation which is still being called."""
+    future: Future
+
+
+@dataclass(frozen=True)
+class OperationStep:
+    """Compiled operation: all options are resolved and validated, names are final.
+
+    If the operation is called on an instance taken from rw_inst by string
+    (obj("alias.field").method()), the instance is resolved on each run and
+    name_from_instance says whether the operation name depends on it.
+    """
+    call: CallSpec
+    op_name: str
+    branch_stack: str
+    operation_stack: str
+    name_from_instance: bool = False
+    def_args: Optional[Tuple] = None
+    assign: Optional[Tuple[AttrPath, ...]] = None
+    rw_inst: Optional[Dict[str, Any]] = None
+    hide_init_inf_from_logs: bool = False
+    check_type_strategy_all: bool = True
+    type_check: TypeCheckGate = field(default_factory=TypeCheckGate)
+    distribute_input_data: bool = False
+    stop_distribution: bool = False
+    burn_rem_args: bool = False
+    raise_err_if_empty_data: bool = False
+    distribution_pool: Optional[CallPool] = None
+    access: Optional[StepAccess] = None
+
+
+@dataclass(frozen=True)
+class BranchPlan:
+    """Compiled branch. Immutable and reusable: every run keeps its state locally.
+
+    Created by Branch.compile(). Nested branches are compiled into nested plans.
+    """
+    br_name: str
+    branch_stack: str
+    steps: Tuple[Union[OperationStep, "BranchPlan"], ...]
+    def_args: Optional[Tuple] = None
+    assign: Optional[Tuple[AttrPath, ...]] = None
+    rw_inst: Optional[Dict[str, Any]] = None
+    all_operations_must_be_executed: bool = False
+    hide_init_inf_from_logs: bool = False
+    check_type_strategy_all: bool = True
+    type_check_mode: Optional[Tuple[str, Optional[Union[int, float]]]] = None
+    distribute_input_data: bool = False
+    raise_err_if_empty_data: bool = False
+    call_pool: Optional[CallPool] = None
+
+    @property
+    def child_stack(self) -> str:
+        return f"{self.branch_stack}(branch)"
+
+    def run(self, input_data: Optional[Any] = None) -> Optional[Any]:
+        return PlanExecutor.run(self, input_data)
+
+    def run_many(
+            self,
+            inputs: Iterable[Optional[Any]],
+            *,
+            ordered: bool = True,
+            workers: int = 1) -> Iterator[Optional[Any]]:
+        return PlanExecutor.run_many(self, inputs, ordered, workers)
+
+    def run_pipelined(
+            self,
+            inputs: Iterable[Optional[Any]],
+            *,
+            queue_size: int = 1) -> Iterator[Optional[Any]]:
+        return PlanExecutor.run_pipelined(self, inputs, queue_size)
+
+
+@dataclass
+class RunState:
+    """Mutable state of one branch run, passed from step to step."""
+    input_data: Optional[Any]
+    rw_inst: Optional[Dict[str, Any]]
+    last_op_stack: str
+    op_stack: str
+    distribute: bool
+    delayed_return: Optional[Tuple] = None
+    result: Optional[Any] = None
+    done: bool = False
+    pending: Optional[PendingCalls] = None
+    plan: Optional["BranchPlan"] = None
+
+
+@dataclass(frozen=True)
+class PipelineError:
+    """Exception raised by a pipeline stage, passed to the consumer in place of the run state."""
+    error: Exception
+
+
+class PipelineQueue:
+    """Blocking queue operations that give up once the pipeline is stopped."""
+    END = object()
+    POLL_INTERVAL = 0.05
+
+    @staticmethod
+    def put(queue: Queue, item: Any, stop: Event) -> bool:
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=PipelineQueue.POLL_INTERVAL)
+                return True
+            except Full:
+                pass
+        return False
+
+    @staticmethod
+    def get(queue: Queue, stop: Event) -> Any:
+        while not stop.is_set():
+            try:
+                return queue.get(timeout=PipelineQueue.POLL_INTERVAL)
+            except Empty:
+                pass
+        return PipelineQueue.END
+
+
+class PlanExecutor:
+    @staticmethod
+    def run(plan: BranchPlan, input_data: Optional[Any] = None) -> Optional[Any]:
+        result, _ = PlanExecutor._run_branch(
+            plan, input_data, None, "INITIAL RUN",
+            plan.distribute_input_data, True)
+        return result
+
+    @staticmethod
+    def run_many(
+            plan: BranchPlan,
+            inputs: Iterable[Optional[Any]],
+            ordered: bool = True,
+            workers: int = 1) -> Iterator[Optional[Any]]:
+        """Run the plan for every input lazily and yield the results.
+
+        With several workers at most 2 * workers inputs are taken ahead,
+        so the memory stays bounded for long or infinite inputs.
+        ordered=False yields the results in the order of completion.
+        Every run writes into its own layers of the Values/Variables given
+        by the rw_inst options (see _with_run_layers).
+        """
+        PlanExecutor._check_positive_int(plan.branch_stack, workers, "The number of workers")
+        return PlanExecutor._run_many(plan, inputs, ordered, workers)
+
+    @staticmethod
+    def _run_many(
+            plan: BranchPlan,
+            inputs: Iterable[Optional[Any]],
+            ordered: bool,
+            workers: int) -> Iterator[Optional[Any]]:
+        if workers == 1:
+            for input_data in inputs:
+                yield PlanExecutor.run(PlanExecutor._with_run_layers(plan), input_data)
+            return
+
+        pool = ThreadPoolExecutor(max_workers=workers)
+        pending = deque()
+        try:
+            for input_data in inputs:
+                pending.append(pool.submit(
+                    PlanExecutor.run, PlanExecutor._with_run_layers(plan), input_data))
+                if len(pending) >= 2 * workers:
+                    yield from PlanExecutor._pop_done(pending, ordered)
+            while pending:
+                yield from PlanExecutor._pop_done(pending, ordered)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _pop_done(pending: deque, ordered: bool) -> Iterator[Optional[Any]]:
+        if ordered:
+            yield pending.popleft().result()
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in [future for future in pending if future in done]:
+            pending.remove(future)
+            yield future.result()
+
+    @staticmethod
+    def run_pipelined(
+            plan: BranchPlan,
+            inputs: Iterable[Optional[Any]],
+            queue_size: int = 1) -> Iterator[Optional[Any]]:
+        """Run the plan for every input with each step on its own thread.
+
+        The steps are connected by queues of queue_size items, so while one
+        step processes an input, the previous step already processes the
+        next one. A full queue blocks the step before it (backpressure).
+        The results are yielded in the order of the inputs.
+        """
+        PlanExecutor._check_positive_int(plan.branch_stack, queue_size, "The queue size")
+        return PlanExecutor._run_pipelined(plan, inputs, queue_size)
+
+    @staticmethod
+    def _run_pipelined(
+            plan: BranchPlan,
+            inputs: Iterable[Optional[Any]],
+            queue_size: int) -> Iterator[Optional[Any]]:
+        stop = Event()
+        queues = [Queue(queue_size) for _ in range(len(plan.steps) + 1)]
+        threads = [Thread(target=PlanExecutor._feed_pipeline,
+                          args=(plan, inputs, queues[0], stop), daemon=True)]
+        for num in range(len(plan.steps)):
+            threads.append(Thread(
+                target=PlanExecutor._run_pipeline_stage,
+                args=(num, queues[num], queues[num + 1], stop), daemon=True))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                state = PipelineQueue.get(queues[-1], stop)
+                if state is PipelineQueue.END:
+                    return
+                elif isinstance(state, PipelineError):
+                    raise state.error
+                elif state.done:
+                    yield state.result
+                else:
+                    yield PlanExecutor._finish_run(state.plan, state)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    @staticmethod
+    def _feed_pipeline(
+            plan: BranchPlan,
+            inputs: Iterable[Optional[Any]],
+            queue: Queue,
+            stop: Event) -> None:
+        try:
+            for input_data in inputs:
+                state = PlanExecutor._start_run(
+                    plan, input_data, None, "INITIAL RUN", plan.distribute_input_data, True)
+                state.plan = PlanExecutor._with_run_layers(plan)
+                if not PipelineQueue.put(queue, state, stop):
+                    return
+        except Exception as error:
+            PipelineQueue.put(queue, PipelineError(error), stop)
+            return
+        PipelineQueue.put(queue, PipelineQueue.END, stop)
+
+    @staticmethod
+    def _run_pipeline_stage(
+            num: int,
+            in_queue: Queue,
+            out_queue: Queue,
+            stop: Event) -> None:
+        while True:
+            state = PipelineQueue.get(in_queue, stop)
+            if state is PipelineQueue.END or isinstance(state, PipelineError):
+                PipelineQueue.put(out_queue, state, stop)
+                return
+            elif not state.done:
+                try:
+                    state.done = PlanExecutor._run_step(state.plan, num, state.plan.steps[num], state)
+                except Exception as error:
+                    PipelineQueue.put(out_queue, PipelineError(error), stop)
+                    return
+            if not PipelineQueue.put(out_queue, state, stop):
+                return
+
+    @staticmethod
+    def _with_run_layers(plan: BranchPlan) -> BranchPlan:
+        """Return the plan with new layers over the Values/Variables of its rw_inst options
+        (of nested branches and operations too), so that the runs of run_many and
+        the items of run_pipelined do not overwrite each other's fields. Other rw_inst instances stay shared."""
+        steps = tuple(
+            PlanExecutor._with_run_layers(step) if isinstance(step, BranchPlan)
+            else replace(step, rw_inst=layer_rw_inst(step.rw_inst)) if step.rw_inst else step
+            for step in plan.steps)
+        if plan.rw_inst is None and all(new is old for new, old in zip(steps, plan.steps)):
+            return plan
+        return replace(plan, steps=steps, rw_inst=layer_rw_inst(plan.rw_inst))
+
+    @staticmethod
+    def _check_positive_int(stack: str, value: Any, name: str) -> None:
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            raise IncorrectParameterError(
+                f"Operation: {stack}. {name} must be a positive int.")
+
+    @staticmethod
+    def _run_branch(
+            plan: BranchPlan,
+            input_data: Optional[Any],
+            rw_inst: Optional[Dict[str, Any]],
+            last_op_stack: str,
+            distribute: bool,
+            initial: bool = False) -> Tuple[Optional[Any], str]:
+        """Execute the steps of the plan one by one in a loop.
+
+        Return the branch result and the stack of the last executed operation.
+        """
+        state = PlanExecutor._start_run(plan, input_data, rw_inst, last_op_stack, distribute, initial)
+        for num, step in enumerate(plan.steps):
+            if PlanExecutor._run_step(plan, num, step, state):
+                return state.result, state.last_op_stack
+        return PlanExecutor._finish_run(plan, state), state.last_op_stack
+
+    @staticmethod
+    def _start_run(
+            plan: BranchPlan,
+            input_data: Optional[Any],
+            rw_inst: Optional[Dict[str, Any]],
+            last_op_stack: str,
+            distribute: bool,
+            initial: bool = False) -> "RunState":
+        if initial and input_data is None and plan.steps[0].def_args is None:
+            input_data = ()
+        state = RunState(input_data, rw_inst, last_op_stack, plan.child_stack, distribute)
+        if plan.call_pool is not None:
+            state.pending = PendingCalls()
+        return state
+
+    @staticmethod
+    def _finish_run(plan: BranchPlan, state: "RunState") -> Optional[Any]:
+        if state.pending:
+            state.pending.join()
+        if plan.assign is not None:
+            return Assigner.do_assign(
+                state.op_stack, plan.assign, state.rw_inst, state.result)
+        return state.result
+
+    @staticmethod
+    def _run_step(
+            plan: BranchPlan,
+            num: int,
+            step: Union[OperationStep, BranchPlan],
+            state: "RunState") -> bool:
+        """Execute one step of the plan on the run state.
+
+        Return True if the branch is ended before its last step,
+        the branch result is in state.result then.
+        """
+        delayed_return = state.delayed_return
+        is_it_operation = isinstance(step, OperationStep)
+        pending = state.pending
+        if pending is not None:
+            pending.check_failed()
+            if not is_it_operation or step.access is None or \
+                    delayed_return is not None or state.distribute:
+                pending.join()
+                pending = None
+            else:
+                pending.wait_for_reads(step.access)
+        if is_it_operation:
+            op_stack = step.operation_stack
+            OptionsChecker.check_burn_rem_args_br(
+                op_stack, step.burn_rem_args,
+                step.stop_distribution, delayed_return)
+        else:
+            op_stack = plan.child_stack
+        state.op_stack = op_stack
+
+        rw_inst = RwInstUpdater.get_updated(op_stack, state.rw_inst, plan.rw_inst)
+        state.rw_inst = rw_inst
+
+        input_data = state.input_data
+        if input_data is None and step.def_args is not None:
+            input_data = step.def_args
+        elif input_data is None:
+            if state.pending:
+                state.pending.join()
+            PlanExecutor._end_branch_check(
+                op_stack, plan.all_operations_must_be_executed,
+                step.raise_err_if_empty_data)
+            state.result = None
+            return True
+        sd, rw_inst = ResultParser.sort_data(to_tuple(input_data), rw_inst)
+        state.rw_inst = rw_inst
+        if sd.stop_all_operations:
+            if state.pending:
+                state.pending.join()
+            PlanExecutor._end_branch_check(
+                op_stack, plan.all_operations_must_be_executed,
+                step.raise_err_if_empty_data, sd.stop_all_operations)
+            log.info(
+                f'Operation: {op_stack}.\n'
+                f'The operation returned the constant '
+                f'"stop_all_further_operations_with_success_result"\n'
+                f'meaning forced stop of all further operations. '
+                f'The branch will return this constant as a result.')
+            state.result = STOP_CONSTANT
+            return True
+
+        distribute = state.distribute
+        if is_it_operation:
+            result, rem_args, op_stack = PlanExecutor._run_operation(
+                step, sd.data, rw_inst, pending, plan.call_pool)
+
+            op_distribute = step.distribute_input_data
+            op_stop = step.stop_distribution
+            if num == len(plan.steps) - 1 and delayed_return is not None:
+                op_stop = True
+            if delayed_return is not None and not op_stop or distribute:
+                distribute = False
+                op_distribute = True
+
+            if op_distribute and not delayed_return:
+                delayed_return = to_tuple(result)
+                result = () if rem_args is None else rem_args
+            elif delayed_return:
+                delayed_return = (*delayed_return, *to_tuple(result))
+                result = () if rem_args is None else rem_args
+            if op_stop:
+                if step.distribution_pool is not None:
+                    delayed_return = PlanExecutor._resolve_pending(delayed_return)
+                result = delayed_return[0] if len(
+                    delayed_return) == 1 else delayed_return
+                delayed_return = None
+
+            if rem_args is not None and delayed_return is None and not distribute:
+                rem_args_hidden = [type(arg) for arg in rem_args]
+                raise RemainingArgsFoundError(
+                    f"Operation: {op_stack}.\n"
+                    f"After executing the operation, data was detected that was not involved\n"
+                    f"in the initialization/call. Len {len(rem_args)}; Their types: {rem_args_hidden}\n"
+                    f"If this is planned, use the burn_rem_args option or use the distribution operation\n"
+                    f"(distributed_input_data ... stop_distribution options).\n"
+                    f"After stopping the distribution, the remaining arguments are also not allowed.")
+            state.op_stack = op_stack
+            state.last_op_stack = op_stack
+        else:
+            child_distribute = step.distribute_input_data
+            if distribute:
+                distribute = False
+                child_distribute = True
+            result, state.last_op_stack = PlanExecutor._run_branch(
+                step, sd.data, renew_def_rw_inst(op_stack, rw_inst),
+                state.last_op_stack, child_distribute)
+
+        state.delayed_return = delayed_return
+        state.distribute = distribute
+        state.input_data = result
+        state.result = result
+        return False
+
+    @staticmethod
+    def _run_operation(
+            step: OperationStep,
+            input_data: Tuple,
+            rw_inst: Dict[str, Any],
+            pending: Optional[PendingCalls] = None,
+            call_pool: Optional[CallPool] = None) -> Tuple[Optional[Any], Optional[Tuple], str]:
+        """With pending calls (the dag mode) the call of an operation with assign is
+        submitted to the call pool and the assigned instances are returned at once."""
+        op_stack = step.operation_stack
+        op_rw_inst = RwInstUpdater.get_updated(op_stack, None, rw_inst)
+        call = step.call
+        if isinstance(call.instance, str):
+            call = replace(call, instance=CallObject._get_instace_from_str(
+                op_stack, call.instance, op_rw_inst))
+            if step.name_from_instance:
+                op_stack = f"{step.branch_stack} -> " \
+                           f"{call.instance.__class__.__name__}(ext_instance).{call.method}"
+        op_rw_inst = RwInstUpdater.get_updated(op_stack, op_rw_inst, step.rw_inst)
+
+        if step.distribution_pool is not None:
+            execute, rem_data = OpProcessor.prepare_call(
+                call, input_data, op_rw_inst, op_stack,
+                step.hide_init_inf_from_logs, step.check_type_strategy_all,
+                step.type_check.should_check())
+            if step.burn_rem_args:
+                rem_data = None
+            if step.assign is not None:
+                return PendingResult(step.distribution_pool.submit(partial(
+                    PlanExecutor._execute_and_assign, execute, op_stack,
+                    step.assign, op_rw_inst))), None, op_stack
+            return PendingResult(step.distribution_pool.submit(execute)), rem_data, op_stack
+
+        if pending is not None and step.assign is not None:
+            execute, _ = OpProcessor.prepare_call(
+                call, input_data, op_rw_inst, op_stack,
+                step.hide_init_inf_from_logs, step.check_type_strategy_all,
+                step.type_check.should_check())
+            OptionsChecker.check_assign_aliases(op_stack, step.assign, op_rw_inst)
+            pending.add(step.access, call_pool.submit(partial(
+                PlanExecutor._execute_and_assign, execute, op_stack, step.assign,
+                op_rw_inst, pending.write_dependencies(step.access))))
+            return assigned_instances(step.assign, op_rw_inst), None, op_stack
+
+        result, rem_data = OpProcessor.process_call(
+            call, input_data, op_rw_inst, op_stack,
+            step.hide_init_inf_from_logs, step.check_type_strategy_all,
+            step.type_check.should_check())
+
+        if step.burn_rem_args:
+            rem_data = None
+
+        if step.assign is not None:
+            return Assigner.do_assign(
+                op_stack, step.assign, op_rw_inst, result), None, op_stack
+
+        return result, rem_data, op_stack
+
+    @staticmethod
+    def _execute_and_assign(
+            execute: Callable[[], Any],
+            op_stack: str,
+            assign: Tuple[AttrPath, ...],
+            rw_inst: Dict[str, Any],
+            dependencies: Tuple[Future, ...] = ()) -> Any:
+        result = execute()
+        if dependencies:
+            wait(dependencies)
+        return Assigner.do_assign(op_stack, assign, rw_inst, result)
+
+    @staticmethod
+    def _resolve_pending(delayed_return: Tuple) -> Tuple:
+        """Wait for the distributed calls, the results are joined in the declared order."""
+        resolved = []
+        for item in delayed_return:
+            if isinstance(item, PendingResult):
+                resolved.extend(to_tuple(item.future.result()))
+            else:
+                resolved.append(item)
+        return tuple(resolved)
+
+    @staticmethod
+    def _end_branch_check(
+            stack: str,
+            all_operations_must_be_executed: bool,
+            raise_err_if_empty_data: bool,
+            stop_operations: Optional[bool] = None) -> None:
+        if stop_operations and all_operations_must_be_executed:
+            raise IncorrectParameterError(
+                f'\nOperation: {stack}.\n'
+                f'The previous operation returned the constant\n'
+                f'"stop_all_further_operations_with_success_result"\n'
+                f'meaning a forced stop of all further operations,\n'
+                f'but it was found that the current branch has the\n'
+                f'option all_operations_must_be_executed=True applied.\n'
+                f'Combining these factors is impossible.')
+        elif all_operations_must_be_executed:
+            raise EmptyDataError(
+                f"Operation: {stack}.\n"
+                f"The data was not received when all operations were\n"
+                f"scheduled to be performed.")
+        elif raise_err_if_empty_data and not stop_operations:
+            raise EmptyDataError(
+                f"Operation: {stack}.\n"
+                f"No data was received. An exception was raised,\n"
+                f"according to the Operation/Branch.raise_err_if_empty_data flag set.")
@@ -1,10 +1,28 @@
+import collections.abc
+import logging
+import random
 import uuid
+from array import array
+from collections import OrderedDict
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
 from inspect import Parameter
-from typing import Any, Dict, Optional, Tuple, Type, Union
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Type, Union, get_args, get_origin
 
 from typeguard import check_type, TypeCheckError, CollectionCheckStrategy
 
+try:
+    from types import UnionType
+    from typing import is_typeddict
+except ImportError:  # Python 3.9
+    UnionType = Union
+
+    def is_typeddict(annotation: Any) -> bool:
+        return isinstance(annotation, type) and issubclass(annotation, dict) and \
+            hasattr(annotation, "__total__")
+
 from .launch_operations.errors import EmptyDataError
 from .type_containers import MandatoryArgTypeContainer, OptionalArgTypeContainer
 from .utils.formatters import LoggerBuilder
@@ -13,17 +31,53 @@ ArgTypeContainer = Union[Type[Union[
     MandatoryArgTypeContainer, OptionalArgTypeContainer]],
     MandatoryArgTypeContainer, OptionalArgTypeContainer]
 
+ParamsLayout = Tuple[Tuple[str, str, Any], ...]
+
+
+class TransientLayout(tuple):
+    """Layout of a callable which ParamsLayoutCache cannot store, it is parsed again on every call.
+
+    A new object is received every time, so binding plans are not cached for it.
+    """
+
 log = LoggerBuilder().build()
 
 
-@dataclass
 class Param:
-    arg: Any = Parameter.empty
-    type: Any = Parameter.empty
-    value: Any = Parameter.empty
-    kind: str = Parameter.empty
-    def_val: Any = Parameter.empty
-    type_container: str = Parameter.empty
+    """Binding state of one parameter. Slotted: created for every parameter on every call."""
+    __slots__ = ("arg", "type", "value", "kind", "def_val", "type_container")
+    __hash__ = None
+
+    def __init__(
+            self,
+            arg: Any = Parameter.empty,
+            type: Any = Parameter.empty,
+            value: Any = Parameter.empty,
+            kind: str = Parameter.empty,
+            def_val: Any = Parameter.empty,
+            type_container: str = Parameter.empty) -> None:
+        self.arg = arg
+        self.type = type
+        self.value = value
+        self.kind = kind
+        self.def_val = def_val
+        self.type_container = type_container
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{self.__class__.__name__}({fields})"
+
+    def _astuple(self) -> Tuple:
+        return self.arg, self.type, self.value, self.kind, self.def_val, self.type_container
+
+
+def params_from_layout(layout: ParamsLayout) -> Dict[str, Param]:
+    return {name: Param(kind=kind, def_val=def_val) for name, kind, def_val in layout}
 
 
 class LogMessageCreator:
@@ -33,6 +87,8 @@ class LogMessageCreator:
             args: Tuple,
             kwargs: Dict[str, Any],
             hide_init_inf_from_logs: bool = False):
+        if not log.isEnabledFor(logging.INFO):
+            return
         args_for_log = tuple([type(arg) for arg in args])
         kw_for_log = LogMessageCreator._get_kwargs_for_log(kwargs)
 
@@ -62,16 +118,212 @@ class LogMessageCreator:
         return kw_for_log
 
 
+class _Ref:
+    """Marker of a value source used when a binding plan is built."""
+    __slots__ = ("kind", "key")
+
+    def __init__(self, kind: str, key: Any) -> None:
+        self.kind = kind
+        self.key = key
+
+
+class BindingPlan:
+    """Result of the full binding made for one shape of the call.
+
+    Each argument is stored as the source of its value (input data position,
+    args/kwargs position, link value of the type container, default value or
+    constant) and the type it should be checked against.
+    """
+    __slots__ = ("args", "kwargs", "rem_data")
+
+    def __init__(self, args: Tuple, kwargs: Tuple, rem_data: Tuple[int, ...]) -> None:
+        self.args = args
+        self.kwargs = kwargs
+        self.rem_data = rem_data
+
+    def apply(
+            self,
+            layout: ParamsLayout,
+            args: Tuple,
+            kwargs: Dict[str, Any],
+            input_data: Tuple,
+            check_type_strategy_all: bool = True,
+            check_types: bool = True) -> Optional[Tuple[Tuple, Dict[str, Any], Optional[Tuple]]]:
+        """Return None if any value does not match its type."""
+        strategy = None if not check_types else \
+            CollectionCheckStrategy.ALL_ITEMS if check_type_strategy_all else \
+            CollectionCheckStrategy.FIRST_ITEM
+        sources = (input_data, args, kwargs, layout)
+        try:
+            new_args = tuple([get_plan_value(source, sources, a_type, strategy)
+                              for source, a_type in self.args])
+            new_kwargs = {name: get_plan_value(source, sources, a_type, strategy)
+                          for name, source, a_type in self.kwargs}
+        except TypeCheckError:
+            return None
+        rem_data = tuple([input_data[num] for num in self.rem_data]) or None
+        return new_args, new_kwargs, rem_data
+
+
+class BindingPlanCache:
+    """Thread-safe LRU cache of binding plans.
+
+    The key is the shape of the call: the parameters layout of the callable, the
+    type containers in args/kwargs (plain values are not part of the key) and
+    the length of the input data. If the plan cannot be built for the shape
+    (typed sequence containers consume input data depending on the values,
+    the full binding raises an error), it is stored as unavailable.
+    """
+    _NO_PLAN = object()
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._plans: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def get(
+            self,
+            layout: ParamsLayout,
+            args: Tuple,
+            kwargs: Dict[str, Any],
+            len_input_data: int) -> Optional[BindingPlan]:
+        if isinstance(layout, TransientLayout):
+            return None
+        refs = [layout]
+        try:
+            key = BindingPlanCache._get_key(layout, args, kwargs, len_input_data, refs)
+        except TypeError:
+            return None
+        with self._lock:
+            entry = self._plans.get(key)
+            if entry is not None:
+                self._plans.move_to_end(key)
+
+        if entry is None:
+            plan = BindingPlanCache._build(layout, args, kwargs, len_input_data)
+            entry = (tuple(refs), BindingPlanCache._NO_PLAN if plan is None else plan)
+            with self._lock:
+                self._plans[key] = entry
+                if len(self._plans) > self.maxsize:
+                    self._plans.popitem(last=False)
+        return None if entry[1] is BindingPlanCache._NO_PLAN else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    @staticmethod
+    def _get_key(
+            layout: ParamsLayout,
+            args: Tuple,
+            kwargs: Dict[str, Any],
+            len_input_data: int,
+            refs: list) -> Tuple:
+        """The layout and the types are identified by id. They are added to refs
+        and stored in the entry with the plan, so while the entry exists its ids
+        cannot be reused by other objects."""
+        containers = set()
+        args_shape = []
+        for arg in args:
+            args_shape.append(get_shape(arg, containers, refs))
+        kwargs_shape = []
+        for name, value in kwargs.items():
+            kwargs_shape.append((name, get_shape(value, containers, refs)))
+        return id(layout), tuple(args_shape), tuple(kwargs_shape), len_input_data
+
+    @staticmethod
+    def _build(
+            layout: ParamsLayout,
+            args: Tuple,
+            kwargs: Dict[str, Any],
+            len_input_data: int) -> Optional[BindingPlan]:
+        """Run the full binding with markers instead of the values and record where they are placed."""
+        for arg in (*args, *kwargs.values()):
+            if is_it_init_arg_type(arg) and arg.is_it_seq_ident_types and \
+                    arg.par_type != Parameter.empty:
+                return None
+
+        args = tuple([get_shadow(arg, "arg", num) for num, arg in enumerate(args)])
+        kwargs = {name: get_shadow(value, "kwarg", name) for name, value in kwargs.items()}
+        input_data = tuple([_Ref("input", num) for num in range(len_input_data)])
+        params = {name: Param(kind=kind, def_val=def_val if def_val is Parameter.empty
+                              else _Ref("default", num))
+                  for num, (name, kind, def_val) in enumerate(layout)}
+        stack = "binding plan"
+        try:
+            InitCore._validate_type_containers(stack, args, kwargs)
+            input_data, args, kwargs = InitCore._fill_type_containers_to_pos_data(
+                stack, input_data, args, kwargs)
+            params = InitCore._upd_params_by_keyword(params, kwargs)
+            arg_params, kw_params = InitCore._separate_params(params)
+            InitCore._check_len_args(stack, arg_params, args)
+            InitCore._check_len_kwargs(stack, kw_params, kwargs)
+            arg_params = InitCore._place_type_value_args(arg_params, args)
+            kw_params = InitCore._place_type_value_kw(kw_params, kwargs)
+            InitCore._check_sequence_in_args(stack, arg_params)
+            InitCore._check_mand_after_opt_at_container(
+                stack, arg_params, kw_params)
+            arg_params, kw_params = InitCore._fill_params_in_init_type_containers(
+                arg_params, kw_params)
+            input_data, arg_params = InitCore._assign_arg_values(input_data, arg_params)
+            rem_data, kw_params = InitCore._assign_kwarg_values(input_data, kw_params)
+            arg_params, kw_params = InitCore._fill_default_values_or_raise_err(
+                stack, arg_params, kw_params)
+        except Exception:
+            return None
+
+        for param in arg_params.values():
+            if param.value is Parameter.empty and param.def_val is not Parameter.empty:
+                param.value = param.def_val
+        return BindingPlan(
+            tuple([get_plan_source(param) for param in arg_params.values()]),
+            tuple([(name, *get_plan_source(param)) for name, param in kw_params.items()]),
+            tuple([elem.key for elem in rem_data]))
+
+
 class InitCore:
+    _binding_plans = BindingPlanCache()
+
+    @staticmethod
+    def bind(
+            stack: str,
+            layout: ParamsLayout,
+            args: Tuple,
+            kwargs: Dict[str, Any],
+            input_data: Tuple,
+            hide_init_inf_from_logs: bool = False,
+            check_type_strategy_all: bool = True,
+            check_types: bool = True) -> Tuple[Tuple, Dict[str, Any], Optional[Tuple]]:
+        """Place input data into args and kwargs using a cached binding plan.
+
+        The full binding (get_args_kwargs) is used when the shape has no plan
+        and to raise the exact error when the plan finds a type mismatch.
+        """
+        plan = InitCore._binding_plans.get(layout, args, kwargs, len(input_data))
+        bound = None if plan is None else plan.apply(
+            layout, args, kwargs, input_data, check_type_strategy_all, check_types)
+        if bound is None:
+            return InitCore.get_args_kwargs(
+                stack, params_from_layout(layout), args, kwargs, input_data,
+                hide_init_inf_from_logs, check_type_strategy_all, check_types)
+
+        args, kwargs, rem_data = bound
+        LogMessageCreator.do_log_message(stack, args, kwargs, hide_init_inf_from_logs)
+        return args, kwargs, rem_data
+
     @staticmethod
     def get_args_kwargs(
             stack: str,
-            params_wo_self: Dict[str, Parameter],
+            params_wo_self: Dict[str, Union[Parameter, Param]],
             args: Tuple,
             kwargs: Dict[str, Any],
             input_data: Tuple,
             hide_init_inf_from_logs: bool = False,
-            check_type_strategy_all: bool = True) -> Tuple[Tuple, Dict[str, Any], Optional[Tuple]]:
+            check_type_strategy_all: bool = True,
+            check_types: bool = True) -> Tuple[Tuple, Dict[str, Any], Optional[Tuple]]:
         InitCore._validate_type_containers(stack, args, kwargs)
         input_data, args, kwargs = InitCore._fill_type_containers_to_pos_data(
             stack, input_data, args, kwargs)
@@ -92,7 +344,7 @@ class InitCore:
         arg_params, kw_params = InitCore._fill_default_values_or_raise_err(
             stack, arg_params, kw_params)
         arg_params, kw_params = InitCore._check_types_and_get_values(
-            stack, arg_params, kw_params, check_type_strategy_all)
+            stack, arg_params, kw_params, check_type_strategy_all, check_types)
         rem_data = None if not rem_data else rem_data
         args = InitCore._get_args(arg_params)
         kwargs = InitCore._get_kwargs(kw_params)
@@ -145,7 +397,7 @@ class InitCore:
                     elem, input_data = replace_and_get_elem_by_pos(input_data, arg.number_position, unique_id)
                     if elem == Parameter.empty and type_container == "mandatory":
                         args_not_enough[num] = arg.number_position
-                    arg.par_value = elem
+                    arg = arg._bind(elem)
             new_args.append(arg)
         args = tuple(new_args)
 
@@ -162,6 +414,7 @@ class InitCore:
 
         kwargs_not_enough = {}
         seq_for_kwargs = []
+        kwargs = dict(kwargs)
         for name, arg in kwargs.items():
             type_container = is_it_init_arg_type(arg)
             if type_container:
@@ -169,8 +422,7 @@ class InitCore:
                     elem, input_data = replace_and_get_elem_by_pos(input_data, arg.number_position, unique_id)
                     if elem == Parameter.empty and type_container == "mandatory":
                         kwargs_not_enough[name] = arg.number_position
-                    arg.par_value = elem
-                    kwargs[name] = arg
+                    kwargs[name] = arg._bind(elem)
                 elif arg.is_it_seq_ident_types:
                     seq_for_kwargs.append(name)
 
@@ -200,6 +452,8 @@ class InitCore:
     def _enrich_params(
             params: Dict[str, Union[Parameter, Param]]) -> Dict[str, Param]:
         for name, param in params.items():
+            if isinstance(param, Param):
+                continue
             kind = param.kind.name
             def_val = param.default
             params[name] = Param(kind=kind, def_val=def_val)
@@ -241,11 +495,13 @@ class InitCore:
         var_positional = any(map(lambda x: x.kind == "VAR_POSITIONAL", arg_params.values()))
 
         mand_args_not_enough = []
+        num_pos_args = 0
         for name, param in arg_params.items():
             if param.kind == "POSITIONAL_ONLY":
-                if param.def_val == Parameter.empty and not args:
+                if param.def_val == Parameter.empty and num_pos_args >= len(args):
                     mand_args_not_enough.append(name)
-                _, args = get_first_element(args)
+                num_pos_args += 1
+        args = args[num_pos_args:]
         args_types = tuple([type(arg) for arg in args])
 
         if not var_positional and args:
@@ -290,8 +546,9 @@ class InitCore:
             args: Tuple) -> Dict[str, Param]:
         arg_params = {name: arg for name, arg in arg_params.items()
                       if arg.kind != "VAR_POSITIONAL"}
+        args = InputCursor(args)
         for name, arg in arg_params.items():
-            elem, args = get_first_element(args)
+            elem = args.next()
             type_container = is_it_arg_type(elem)
             if not type_container:
                 type_container = Parameter.empty
@@ -301,21 +558,17 @@ class InitCore:
             arg.type_container = type_container
             arg_params[name] = arg
 
-        if args:
-            counter = 1
-            while args:
-                elem, args = get_first_element(args)
-                type_container = is_it_arg_type(elem)
-                if not type_container:
-                    type_container = Parameter.empty
-                el_type, value = get_type_value(elem)
-                name = f"{counter}_pos_arg"
-                arg_params[name] = Param(
-                    type=el_type,
-                    value=value,
-                    kind="VAR_POSITIONAL",
-                    type_container=type_container)
-                counter += 1
+        for counter, elem in enumerate(args.rest(), 1):
+            type_container = is_it_arg_type(elem)
+            if not type_container:
+                type_container = Parameter.empty
+            el_type, value = get_type_value(elem)
+            name = f"{counter}_pos_arg"
+            arg_params[name] = Param(
+                type=el_type,
+                value=value,
+                kind="VAR_POSITIONAL",
+                type_container=type_container)
 
         return arg_params
 
@@ -397,6 +650,7 @@ class InitCore:
         seq_num: Union[int, float] = 0
         new_param_map = {}
         kind = "POSITIONAL_ONLY"
+        input_data = InputCursor(input_data)
         for name, param in arg_params.items():
             if param.kind == "VAR_POSITIONAL":
                 seq_num = int(seq_num + 1)
@@ -405,33 +659,30 @@ class InitCore:
             if type_container:
                 a_type = get_args_from_arg_type(param.type)
                 if a_type and is_it_init_arg_type(param.type) and param.type.is_it_seq_ident_types:
-                    input_data, p_map, seq_num = SequenceConsumer.consume_seq_with_type(
+                    new_param_map, seq_num = SequenceConsumer.consume_seq_with_type(
                         input_data, new_param_map, kind, type_container, seq_num, a_type)
-                    new_param_map = {**new_param_map, **p_map}
                 elif not a_type and is_it_init_arg_type(param.type) and param.type.is_it_seq_ident_types:
-                    input_data, p_map, seq_num = SequenceConsumer.consume_seq_without_type(
+                    new_param_map, seq_num = SequenceConsumer.consume_seq_without_type(
                         input_data, new_param_map, kind, type_container, seq_num)
-                    new_param_map = {**new_param_map, **p_map}
                 else:
-                    param, input_data = set_arg_type_value(param, input_data, a_type)
-                    new_param_map[name] = param
+                    new_param_map[name] = set_arg_type_value(param, input_data, a_type)
             else:
                 new_param_map[name] = param
 
-        return input_data, new_param_map
+        return input_data.rest(), new_param_map
 
     @staticmethod
     def _assign_kwarg_values(
             input_data: Tuple,
             kw_params: Dict[str, Param]) -> Tuple[Tuple, Dict[str, Param]]:
+        input_data = InputCursor(input_data)
         for name, param in kw_params.items():
             type_container = is_it_arg_type(param.type)
             if type_container:
                 a_type = get_args_from_arg_type(param.type)
-                param, input_data = set_arg_type_value(param, input_data, a_type)
-                kw_params[name] = param
+                kw_params[name] = set_arg_type_value(param, input_data, a_type)
 
-        return input_data, kw_params
+        return input_data.rest(), kw_params
 
     @staticmethod
     def _fill_default_values_or_raise_err(
@@ -461,11 +712,14 @@ class InitCore:
             stack: str,
             arg_params: Dict[str, Param],
             kw_params: Dict[str, Param],
-            check_type_strategy_all: bool = True) -> Tuple[Dict[str, Param], Dict[str, Param]]:
+            check_type_strategy_all: bool = True,
+            check_types: bool = True) -> Tuple[Dict[str, Param], Dict[str, Param]]:
         for name, param in arg_params.items():
             if param.value == Parameter.empty and param.def_val != Parameter.empty:
                 param.value = param.def_val
 
+        if not check_types:
+            return fill_values(arg_params), fill_values(kw_params)
         kw_type_err = check_arg_type(kw_params, check_type_strategy_all)
         args_type_err = check_arg_type(arg_params, check_type_strategy_all)
         if kw_type_err or args_type_err:
@@ -493,26 +747,54 @@ class InitCore:
         return tuple(args)
 
 
+class InputCursor:
+    """Read position in the input data.
+
+    Consuming n elements is O(n): the tuple is not copied per element,
+    the rest is sliced once at the end.
+    """
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data: Tuple) -> None:
+        self.data = data
+        self.pos = 0
+
+    def __bool__(self) -> bool:
+        return self.pos < len(self.data)
+
+    def peek(self) -> Any:
+        return self.data[self.pos] if self.pos < len(self.data) else Parameter.empty
+
+    def next(self) -> Any:
+        elem = self.peek()
+        if self.pos < len(self.data):
+            self.pos += 1
+        return elem
+
+    def rest(self) -> Tuple:
+        return self.data[self.pos:] if self.pos else self.data
+
+
 class SequenceConsumer:
     @staticmethod
     def consume_seq_with_type(
-            input_data: Tuple,
+            input_data: InputCursor,
             new_param_map: Dict[Union[str, float, int], Param],
             kind: str,
             type_container: str,
             seq_num: Union[int, float],
             a_type: Type
-    ) -> Tuple[Tuple, Dict[Union[str, float, int], Param], Union[str, float, int]]:
+    ) -> Tuple[Dict[Union[str, float, int], Param], Union[str, float, int]]:
         execution_flag = False
-        while True:
-            elem, input_data = get_first_element(input_data)
-            strategy = CollectionCheckStrategy.ALL_ITEMS
+        strategy = CollectionCheckStrategy.ALL_ITEMS
+        while input_data:
+            elem = input_data.peek()
             try:
-                check_type(elem, a_type,
-                           collection_check_strategy=strategy)
+                TypeChecker.check(elem, a_type, strategy)
                 execution_flag = True
             except TypeCheckError:
                 break
+            input_data.next()
             seq_num = round(seq_num + 0.1, 3)
             new_param_map[seq_num] = Param(
                 value=elem, kind=kind,
@@ -522,31 +804,145 @@ class SequenceConsumer:
             new_param_map[seq_num] = Param(
                 arg=Parameter.empty, type=a_type, kind=kind,
                 type_container=type_container)
-        elem = () if elem == Parameter.empty else (elem,)
-        input_data = (*elem, *input_data)
 
-        return input_data, new_param_map, seq_num
+        return new_param_map, seq_num
 
     @staticmethod
     def consume_seq_without_type(
-            input_data: Tuple,
+            input_data: InputCursor,
             new_param_map: Dict[Union[str, float, int], Param],
             kind: str,
             type_container: str,
             seq_num: Union[int, float]
-    ) -> Tuple[Tuple, Dict[Union[str, float, int], Param], Union[str, float, int]]:
+    ) -> Tuple[Dict[Union[str, float, int], Param], Union[str, float, int]]:
         while input_data:
-            elem, input_data = get_first_element(input_data)
-            param = Param(value=elem, kind=kind,
+            param = Param(value=input_data.next(), kind=kind,
                           type_container=type_container)
             seq_num = round(seq_num + 0.1, 3)
             new_param_map[seq_num] = param
 
-        return input_data, new_param_map, seq_num
+        return new_param_map, seq_num
+
+
+@dataclass
+class TypeVerdictCacheInfo:
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class TypeVerdictCache:
+    """Thread-safe LRU cache of type check verdicts for plain classes.
+
+    The key is (runtime type of the value, expected class): for a plain class
+    the verdict depends only on the type of the value. If isinstance fails,
+    the verdict is taken from typeguard (it also accepts int for float etc.).
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._verdicts: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def is_instance(self, value: Any, expected_type: type) -> bool:
+        key = (type(value), expected_type)
+        with self._lock:
+            verdict = self._verdicts.get(key)
+            if verdict is not None:
+                self.hits += 1
+                self._verdicts.move_to_end(key)
+                return verdict
+            self.misses += 1
+
+        verdict = isinstance(value, expected_type)
+        if not verdict:
+            try:
+                check_type(value, expected_type)
+                verdict = True
+            except TypeCheckError:
+                pass
+        with self._lock:
+            self._verdicts[key] = verdict
+            if len(self._verdicts) > self.maxsize:
+                self._verdicts.popitem(last=False)
+        return verdict
+
+    def cache_info(self) -> TypeVerdictCacheInfo:
+        return TypeVerdictCacheInfo(self.hits, self.misses, self.maxsize, len(self._verdicts))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._verdicts.clear()
+            self.hits = 0
+            self.misses = 0
 
 
-def set_arg_type_value(param: Param, input_data: Tuple, a_type: Type) -> Tuple[Param, Tuple]:
-    elem, input_data = get_first_element(input_data)
+class TypeChecker:
+    verdicts = TypeVerdictCache()
+
+    @staticmethod
+    def check(
+            value: Any,
+            expected_type: Any,
+            strategy: CollectionCheckStrategy = CollectionCheckStrategy.ALL_ITEMS) -> None:
+        """Raise TypeCheckError if the value does not match the expected type.
+
+        Plain classes are checked by the exact type or the verdict cache.
+        Supported generics (see get_type_checker) are checked by the checker
+        built for the annotation, typeguard confirms the failure and makes
+        the error message. Other annotations are checked by typeguard.
+        """
+        if is_it_plain_class(expected_type):
+            if type(value) is not expected_type and \
+                    not TypeChecker.verdicts.is_instance(value, expected_type):
+                raise TypeCheckError(f"is not an instance of {expected_type!r}")
+            return
+        checker = get_type_checker(expected_type)
+        if checker is not None and checker(
+                value, strategy is not CollectionCheckStrategy.FIRST_ITEM):
+            return
+        check_type(value, expected_type, collection_check_strategy=strategy)
+
+
+class TypeCheckGate:
+    """Decide whether types are checked in the current execution.
+
+    full - always, off - never (only arity is checked), first_run - in the
+    first N executions, sampled - in the given fraction of executions.
+    Every operation of a branch gets its own gate, kept by the branch between runs.
+    """
+
+    def __init__(self, mode: str = "full", value: Optional[Union[int, float]] = None) -> None:
+        self.mode = mode
+        self.value = value
+        self._runs = 0
+        self._lock = Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Branches are pickled for the process executor, the lock is created again
+        return {"mode": self.mode, "value": self.value, "_runs": self._runs}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def should_check(self) -> bool:
+        if self.mode == "full":
+            return True
+        elif self.mode == "first_run":
+            with self._lock:
+                self._runs += 1
+                return self._runs <= self.value
+        elif self.mode == "sampled":
+            return random.random() < self.value
+        return False
+
+
+def set_arg_type_value(param: Param, input_data: InputCursor, a_type: Type) -> Param:
+    elem = input_data.next()
     if a_type:
         param.arg = elem
         param.type = a_type
@@ -554,7 +950,7 @@ def set_arg_type_value(param: Param, input_data: Tuple, a_type: Type) -> Tuple[P
         param.arg = Parameter.empty
         param.type = Parameter.empty
         param.value = elem
-    return param, input_data
+    return param
 
 
 def fill_params(
@@ -601,19 +997,16 @@ def fill_def_values(params: Dict[str, Param]) -> Tuple[Dict[str, str], Dict[str,
 
 
 def is_it_arg_type(arg: Any) -> Optional[str]:
-    if "__dict__" in dir(arg) and "__origin__" in arg.__dict__ and \
-            arg.__dict__["__origin__"] is OptionalArgTypeContainer or \
-            isinstance(arg, OptionalArgTypeContainer):
+    if isinstance(arg, OptionalArgTypeContainer):
+        return "optional"
+    elif isinstance(arg, MandatoryArgTypeContainer):
+        return "mandatory"
+    origin = getattr(arg, "__dict__", {}).get("__origin__")
+    if origin is OptionalArgTypeContainer:
         return "optional"
-    elif "__dict__" in dir(arg) and "__origin__" in arg.__dict__ and \
-            arg.__dict__["__origin__"] is MandatoryArgTypeContainer or \
-            isinstance(arg, MandatoryArgTypeContainer):
+    elif origin is MandatoryArgTypeContainer:
         return "mandatory"
-    class_name = None
-    try:
-        class_name = arg.__name__
-    except AttributeError:
-            pass
+    class_name = getattr(arg, "__name__", None)
     if class_name == "MandatoryArgTypeContainer":
         return "mandatory"
     elif class_name == "OptionalArgTypeContainer":
@@ -638,12 +1031,6 @@ def get_args_from_arg_type(
     return None
 
 
-def get_first_element(input_data: Tuple) -> Tuple[Any, Tuple]:
-    if not len(input_data):
-        return Parameter.empty, input_data
-    return input_data[0], input_data[1:]
-
-
 def replace_and_get_elem_by_pos(input_data: Tuple, elem_pos: int, replacement: Any) -> Tuple[Any, Tuple]:
     if elem_pos <= 0 or elem_pos > len(input_data):
         return Parameter.empty, input_data
@@ -670,14 +1057,204 @@ def check_arg_type(
                 check_type_strategy_all else \
                 CollectionCheckStrategy.FIRST_ITEM
             try:
-                check_type(param.arg, param.type,
-                           collection_check_strategy=strategy)
+                TypeChecker.check(param.arg, param.type, strategy)
             except TypeCheckError:
                 type_err[name] = (type(param.arg), param.type)
 
     return type_err
 
 
+def get_shape(value: Any, containers: set, refs: list) -> Optional[Tuple]:
+    if isinstance(value, MandatoryArgTypeContainer):
+        if id(value) in containers:
+            raise TypeError("The same type container is used several times.")
+        containers.add(id(value))
+        refs.append(value.par_type)
+        return (type(value), type(value.link_or_pos), value.number_position,
+                value.param_link is None, value.is_it_seq_ident_types,
+                id(value.par_type), value.par_value is Parameter.empty)
+    type_container = is_it_arg_type(value)
+    if type_container:
+        refs.append(value)
+        return type_container, id(value)
+    return None
+
+
+def get_shadow(value: Any, kind: str, key: Union[int, str]) -> Any:
+    if is_it_init_arg_type(value):
+        if value.par_value is not Parameter.empty and not value.number_position:
+            return value._bind(_Ref(f"link_{kind}", key))
+        return value
+    if is_it_arg_type(value):
+        return value
+    return _Ref(kind, key)
+
+
+def get_plan_source(param: Param) -> Tuple[Tuple[str, Any], Any]:
+    if param.arg is not Parameter.empty:
+        value, a_type = param.arg, param.type
+    else:
+        value, a_type = param.value, Parameter.empty
+    if isinstance(value, _Ref):
+        return (value.kind, value.key), a_type
+    return ("const", value), a_type
+
+
+def get_plan_value(
+        source: Tuple[str, Any],
+        sources: Tuple[Tuple, Tuple, Dict[str, Any], ParamsLayout],
+        a_type: Any,
+        strategy: Optional[CollectionCheckStrategy]) -> Any:
+    """Return the value from its source. The type is not checked if the strategy is None."""
+    kind, key = source
+    if kind == "input":
+        value = sources[0][key]
+    elif kind == "arg":
+        value = sources[1][key]
+    elif kind == "kwarg":
+        value = sources[2][key]
+    elif kind == "link_arg":
+        value = sources[1][key].par_value
+    elif kind == "link_kwarg":
+        value = sources[2][key].par_value
+    elif kind == "default":
+        value = sources[3][key][2]
+    else:
+        value = key
+    if a_type is not Parameter.empty and strategy is not None:
+        TypeChecker.check(value, a_type, strategy)
+    return value
+
+
+def is_it_plain_class(annotation: Any) -> bool:
+    try:
+        return _is_it_plain_class(annotation)
+    except TypeError:
+        return False
+
+
+@lru_cache(maxsize=1024)
+def _is_it_plain_class(annotation: Any) -> bool:
+    """Any and classes that typeguard checks by the value content are not plain:
+    TypedDict, Protocol and NamedTuple."""
+    return isinstance(annotation, type) and annotation is not Any and \
+        get_origin(annotation) is None and \
+        not is_typeddict(annotation) and \
+        not getattr(annotation, "_is_protocol", False) and \
+        not (issubclass(annotation, tuple) and annotation is not tuple)
+
+
+TypeCheckerFunc = Callable[[Any, bool], bool]
+
+
+def get_type_checker(annotation: Any) -> Optional[TypeCheckerFunc]:
+    """Return the checker built for the annotation or None if it is not supported.
+
+    The checker takes the value and the all_items flag (False means that only
+    the first item of collections is checked, as CollectionCheckStrategy.FIRST_ITEM).
+    Supported: Any, plain classes, List[X], Sequence[X], Dict[K, V], Tuple[X, ...],
+    Tuple[X, Y], Union[X, Y] / Optional[X] / X | Y, and their nesting.
+    """
+    try:
+        return _get_type_checker(annotation)
+    except TypeError:
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _get_type_checker(annotation: Any) -> Optional[TypeCheckerFunc]:
+    if annotation is Any:
+        return lambda value, all_items: True
+    if is_it_plain_class(annotation):
+        return lambda value, all_items: type(value) is annotation or \
+            TypeChecker.verdicts.is_instance(value, annotation)
+
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+    if origin in (Union, UnionType):
+        checkers = [get_type_checker(arg) for arg in args]
+        if None in checkers:
+            return None
+        return lambda value, all_items: any(
+            checker(value, all_items) for checker in checkers)
+
+    if origin in (list, collections.abc.Sequence):
+        collection_type = list if origin is list else collections.abc.Sequence
+        if not args or args == (Any,):
+            return lambda value, all_items: isinstance(value, collection_type)
+        items_checker = get_items_checker(args[0])
+        if items_checker is None:
+            return None
+        return lambda value, all_items: isinstance(value, collection_type) and \
+            items_checker(value, all_items)
+
+    if origin is dict:
+        if not args or args == (Any, Any):
+            return lambda value, all_items: isinstance(value, dict)
+        keys_checker = get_items_checker(args[0])
+        values_checker = get_items_checker(args[1])
+        if keys_checker is None or values_checker is None:
+            return None
+        return lambda value, all_items: isinstance(value, dict) and \
+            keys_checker(value.keys(), all_items) and values_checker(value.values(), all_items)
+
+    if origin is tuple and args and args != ((),):
+        if len(args) == 2 and args[1] is Ellipsis:
+            items_checker = get_items_checker(args[0])
+            if items_checker is None:
+                return None
+            return lambda value, all_items: isinstance(value, tuple) and \
+                items_checker(value, all_items)
+        if Ellipsis in args:
+            return None
+        item_checkers = [get_type_checker(arg) for arg in args]
+        if None in item_checkers:
+            return None
+        return lambda value, all_items: isinstance(value, tuple) and \
+            len(value) == len(item_checkers) and all(
+                checker(item, all_items) for checker, item in zip(item_checkers, value))
+    return None
+
+
+def get_items_checker(annotation: Any) -> Optional[Callable[[Iterable, bool], bool]]:
+    """Return the checker of collection items. If all_items is False, only the first item is checked."""
+    if annotation is Any:
+        return lambda items, all_items: True
+    if is_it_plain_class(annotation):
+        return lambda items, all_items: are_instances(
+            items if all_items else list(islice(items, 1)), annotation)
+    checker = get_type_checker(annotation)
+    if checker is None:
+        return None
+    return lambda items, all_items: all(
+        checker(item, all_items) for item in (items if all_items else islice(items, 1)))
+
+
+ARRAY_TYPECODES = {
+    "b": int, "B": int, "h": int, "H": int, "i": int, "I": int,
+    "l": int, "L": int, "q": int, "Q": int, "f": float, "d": float, "u": str, "w": str}
+
+
+def are_instances(items: Iterable, expected_type: type) -> bool:
+    """Check all items against a plain class in bulk.
+
+    The distinct types of the items are collected in C (set(map(type, ...))),
+    so a homogeneous list of a million ints costs one pass and no verdicts.
+    For other types one item of each is checked by the verdict cache.
+    The type of array.array items is known from its typecode.
+    """
+    if isinstance(items, array) and len(items) and items.typecode in ARRAY_TYPECODES:
+        item_types = {ARRAY_TYPECODES[items.typecode]}
+    else:
+        item_types = set(map(type, items))
+    for item_type in item_types:
+        if item_type is not expected_type:
+            sample = next(item for item in items if type(item) is item_type)
+            if not TypeChecker.verdicts.is_instance(sample, expected_type):
+                return False
+    return True
+
+
 def fill_values(params: Dict[str, Param]) -> Dict[str, Param]:
     for name, param in params.items():
         if param.arg != Parameter.empty:
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import Any, List, Optional, Tuple, Callable, Dict
 
+from .rw_inst_registry import RwInstRegistry
 from ..constants import STOP_CONSTANT
 
 
@@ -10,27 +11,23 @@ class SortedData:
     rw_instances: Optional[List[Any]] = None
     stop_all_operations: bool = False
 
-    def separate_rw_instances(self, rw_inst: Dict[str, Any]) -> None:
+    def separate_rw_instances(self, registry: RwInstRegistry) -> None:
         result = ResultParser.split_data_by_condition(
-            self.data, rw_inst, ResultParser.is_it_rw_instance)
+            self.data, registry, ResultParser.is_it_rw_instance)
         self.data, self.rw_instances = result
 
-    def separate_all_operations_constant(self, rw_inst: Dict[str, Any]) -> None:
+    def separate_all_operations_constant(self, registry: RwInstRegistry) -> None:
         result = ResultParser.split_data_by_condition(
-            self.data, rw_inst, ResultParser.is_it_stop_message)
+            self.data, registry, ResultParser.is_it_stop_message)
         self.data, stop_all_operations = result
 
         if stop_all_operations:
             self.stop_all_operations = True
 
-    def update_instances(self, rw_inst: Dict[str, Any]) -> Dict[str, Any]:
-        """Add rw_instance in List if not exist or reassign existed."""
+    def update_instances(self, registry: RwInstRegistry) -> None:
+        """Reassign the existed rw_instances in the indexed rw_inst."""
         for new_instance in self.rw_instances:
-            for name, old_rw in rw_inst.items():
-                if isinstance(new_instance, type(old_rw)):
-                    rw_inst[name] = new_instance
-
-        return rw_inst
+            registry.reassign(new_instance)
 
 
 class ResultParser:
@@ -45,14 +42,16 @@ class ResultParser:
         This will also be a trigger to start the next operation without passing pos_args to it.
         """
         sd = SortedData(data=data)
-        sd.separate_rw_instances(rw_inst)
-        sd.separate_all_operations_constant(rw_inst)
-        new_rw_inst = sd.update_instances(rw_inst)
+        registry = RwInstRegistry(rw_inst)
+        sd.separate_rw_instances(registry)
+        sd.separate_all_operations_constant(registry)
+        sd.update_instances(registry)
 
-        return sd, new_rw_inst
+        return sd, rw_inst
 
     @staticmethod
-    def split_data_by_condition(data: Tuple, rw_inst: Dict[str, Any], condition: Callable) -> Tuple[Tuple, List[Any]]:
+    def split_data_by_condition(
+            data: Tuple, registry: RwInstRegistry, condition: Callable) -> Tuple[Tuple, List[Any]]:
         """Perform pos_args analysis and separate special elements from tuple sequence only.
 
         (separate elements, corresponding passed conditions from
@@ -60,23 +59,22 @@ class ResultParser:
         """
         instances, new_data = [], []
         for num, pos in enumerate(data):
-            if condition(pos, rw_inst):
+            if condition(pos, registry):
                 instances += [pos]
             else:
                 new_data.append(pos)
         return tuple(new_data), instances
 
     @staticmethod
-    def is_it_rw_instance(obj: Any, rw_inst: Dict[str, Any]) -> bool:
+    def is_it_rw_instance(obj: Any, registry: RwInstRegistry) -> bool:
         """Check if the obj is a rw_instance.
 
         Return True if yes.
         """
-        rw_classes = list(map(lambda x: type(x), rw_inst.values()))
-        return any(map(lambda dclss: isinstance(obj, dclss), rw_classes))
+        return registry.is_rw_instance(obj)
 
     @staticmethod
-    def is_it_stop_message(obj: Any, _: Dict[str, Any]) -> bool:
+    def is_it_stop_message(obj: Any, _: RwInstRegistry) -> bool:
         """Check if the obj is a stop message: "stop_all_further_operations_with_success_result".
 
         Return True if yes.
@@ -0,0 +1,53 @@
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+
+class RwInstRegistry:
+    """Index of the rw instances by their exact type and by every class of its MRO.
+
+    rw_inst = {"val": Values(), "ja": JobArgs()}
+    RwInstRegistry(rw_inst).instances_of(JobArgs) -> {"ja": JobArgs()}
+    RwInstRegistry(rw_inst).matching_aliases(ChildOfJobArgs()) -> ("ja",)
+    """
+    __slots__ = ("_rw_inst", "_by_type", "_by_class", "_matching")
+
+    def __init__(self, rw_inst: Dict[str, Any]) -> None:
+        self._rw_inst = rw_inst
+        self._by_type: Dict[Type, List[str]] = {}
+        self._by_class: Optional[Dict[Type, Dict[str, Any]]] = None
+        self._matching: Dict[Type, Tuple[str, ...]] = {}
+        for alias, inst in rw_inst.items():
+            self._by_type.setdefault(type(inst), []).append(alias)
+
+    def instances_of(self, cls: Type) -> Dict[str, Any]:
+        """Return the instances for which isinstance(inst, cls) is True."""
+        if self._by_class is None:
+            self._by_class = {}
+            for alias, inst in self._rw_inst.items():
+                for inst_cls in type(inst).__mro__:
+                    self._by_class.setdefault(inst_cls, {})[alias] = inst
+        return self._by_class.get(cls, {})
+
+    def matching_aliases(self, obj: Any) -> Tuple[str, ...]:
+        """Return the aliases of the instances whose type obj is an instance of."""
+        obj_type = type(obj)
+        try:
+            return self._matching[obj_type]
+        except KeyError:
+            aliases = tuple(alias for cls in obj_type.__mro__ for alias in self._by_type.get(cls, ()))
+            self._matching[obj_type] = aliases
+            return aliases
+
+    def is_rw_instance(self, obj: Any) -> bool:
+        return bool(self.matching_aliases(obj))
+
+    def reassign(self, new_instance: Any) -> None:
+        """Replace every instance whose type new_instance is an instance of (in the indexed dict too)."""
+        new_type = type(new_instance)
+        for alias in self.matching_aliases(new_instance):
+            old_type = type(self._rw_inst[alias])
+            self._rw_inst[alias] = new_instance
+            if old_type is not new_type:
+                self._by_type[old_type].remove(alias)
+                self._by_type.setdefault(new_type, []).append(alias)
+                self._matching.clear()
+        self._by_class = None
@@ -1,5 +1,6 @@
 from typing import Any, Dict, Optional, List, Type
 
+from .rw_inst_registry import RwInstRegistry
 from ..default.rw_classes import Values, Variables
 
 
@@ -43,24 +44,19 @@ class RwInstUpdater:
         return {alias: inst for alias, inst in rw_inst.items()
                 if not (isinstance(inst, Values) or isinstance(inst, Variables))}
 
-    @staticmethod
-    def _merge_class(cls: Any, input_rw_inst: Dict[str, Any], opt_rw_inst: Dict[str, Any]):
-        cls_input = RwInstUpdater._separate_cls_inst(input_rw_inst, cls)
-        cls_opt = RwInstUpdater._separate_cls_inst(opt_rw_inst, cls)
-        return cls_opt if cls_opt else cls_input
-
     @staticmethod
     def _merge_rw_inst(
             current_rw_inst: Dict[str, Any],
             rw_inst_from_option: Dict[str, Any]) -> Dict[str, Any]:
+        current_reg = RwInstRegistry(current_rw_inst)
+        opt_reg = RwInstRegistry(rw_inst_from_option)
         all_classes = [*RwInstUpdater._get_classes(current_rw_inst),
                        *RwInstUpdater._get_classes(rw_inst_from_option)]
 
-        list_dicts = list(map(lambda cls: RwInstUpdater._merge_class(
-            cls, current_rw_inst, rw_inst_from_option), all_classes))
-
-        result = {k: v for d in list_dicts for k, v in d.items()}
-        all_res_clss = RwInstUpdater._get_classes(result)
+        result = {}
+        for cls in all_classes:
+            result.update(opt_reg.instances_of(cls) or current_reg.instances_of(cls))
+        all_res_clss = set(RwInstUpdater._get_classes(result))
         if Values not in all_res_clss:
             result["val"] = Values()
         if Variables not in all_res_clss:
@@ -0,0 +1,98 @@
+from concurrent.futures import Future, wait
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.common import AttrPath, parse_attr_path
+from ..initialization_core import is_it_init_arg_type
+
+
+def paths_overlap(first: AttrPath, second: AttrPath) -> bool:
+    """"val.a" overlaps "val.a.b" and "val", but not "val.b" or "var.a"."""
+    if first.alias != second.alias:
+        return False
+    len_common = min(len(first.fields), len(second.fields))
+    return first.fields[:len_common] == second.fields[:len_common]
+
+
+@dataclass(frozen=True)
+class StepAccess:
+    """Fields of rw_inst an operation reads and writes.
+
+    reads - links of the type containers, read when the arguments are bound;
+    uses - whole objects given to the call (link to an alias, instance from string),
+    the call can change them; writes - the assign option.
+    """
+    reads: Tuple[AttrPath, ...] = ()
+    uses: Tuple[AttrPath, ...] = ()
+    writes: Tuple[AttrPath, ...] = ()
+
+    @staticmethod
+    def from_call(call: Any, assign: Optional[Tuple[AttrPath, ...]]) -> "StepAccess":
+        reads, uses = [], []
+        if isinstance(call.instance, str):
+            uses.append(parse_attr_path(call.instance))
+        for args_kwargs in (call.func_args_kwargs, call.init_args_kwargs, call.meth_args_kwargs):
+            if args_kwargs is None:
+                continue
+            args, kwargs = args_kwargs
+            for arg in (*args, *kwargs.values()):
+                if is_it_init_arg_type(arg) and arg.param_link:
+                    (reads if arg.param_path.fields else uses).append(arg.param_path)
+        return StepAccess(tuple(reads), tuple(uses), () if assign is None else assign)
+
+    def changes(self) -> Tuple[AttrPath, ...]:
+        return (*self.uses, *self.writes)
+
+    def depends_on(self, paths: Tuple[AttrPath, ...], earlier: "StepAccess") -> bool:
+        return any(paths_overlap(path, changed) for path in paths for changed in earlier.changes())
+
+
+class PendingCalls:
+    """Deferred calls of a branch run in the dependency graph mode, in the declared order."""
+    __slots__ = ("_calls",)
+
+    def __init__(self) -> None:
+        self._calls: List[Tuple[StepAccess, Future]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self._calls)
+
+    def add(self, access: StepAccess, future: Future) -> None:
+        self._calls.append((access, future))
+
+    def wait_for_reads(self, access: StepAccess) -> None:
+        """Wait for the earlier calls that change what the operation reads while it is bound."""
+        paths = (*access.reads, *access.uses)
+        self._wait([future for earlier, future in self._calls if access.depends_on(paths, earlier)])
+
+    def write_dependencies(self, access: StepAccess) -> Tuple[Future, ...]:
+        """Calls which have to be finished before the operation assigns its result."""
+        return tuple(future for earlier, future in self._calls if access.depends_on(access.changes(), earlier))
+
+    def check_failed(self) -> None:
+        """Drop the finished calls; if one of them failed, wait for all and raise the first error."""
+        if any(future.done() and future.exception() is not None for _, future in self._calls):
+            self.join()
+        self._calls = [call for call in self._calls if not call[1].done()]
+
+    def join(self) -> None:
+        """Wait for all calls and raise the error of the first failed one in the declared order."""
+        calls, self._calls = self._calls, []
+        self._wait([future for _, future in calls])
+
+    @staticmethod
+    def _wait(futures: List[Future]) -> None:
+        if futures:
+            wait(futures)
+            for future in futures:
+                future.result()
+
+
+def assigned_instances(
+        assign: Tuple[AttrPath, ...], rw_inst: Dict[str, Any]) -> Tuple:
+    """The result of a successful assign, known before the call (see assign_to_paths)."""
+    rw_instances: Dict[str, Any] = {}
+    for path in assign:
+        dclass = rw_inst[path.alias]
+        rw_instances[dclass.__class__.__name__] = dclass
+    return tuple(rw_instances.values())
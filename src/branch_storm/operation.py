@@ -1,19 +1,73 @@
+from dataclasses import dataclass
+from functools import partial
 from inspect import isfunction, isclass, ismethod, Parameter, signature
+from threading import Lock
 from typing import Any, Dict, Optional, Tuple, Union, Callable, Type
+from weakref import WeakKeyDictionary
 
-from .constants import PARAMETER_WAS_NOT_EXPANDED
-from .default.assign_results import assign
+from .constants import PARAMETER_WAS_NOT_EXPANDED, TYPE_CHECK_MODES
+from .default.assign_results import assign_to_paths
 from .launch_operations.errors import IncorrectParameterError, AssignmentError, DistributionError
 from .utils.common import to_tuple
 from .launch_operations.rw_inst_updater import RwInstUpdater
-from .initialization_core import InitCore, is_it_init_arg_type
-from .utils.common import find_rw_inst
+from .initialization_core import InitCore, Param, ParamsLayout, TransientLayout, TypeCheckGate, \
+    is_it_init_arg_type, params_from_layout
+from .utils.common import AttrPath, find_rw_inst, parse_attr_path
 from .utils.formatters import LoggerBuilder, error_formatter
 
 log = LoggerBuilder().build()
 
 
+class ParamsLayoutCache:
+    """Thread-safe cache of parsed signatures.
+
+    The key is the function, the class __init__, the unbound method or the class.
+    Weak references are used, so callables created dynamically are removed from
+    the cache together with them and a new object never gets someone else's layout.
+    Callables that cannot be weakly referenced or hashed are parsed every time
+    (their layout is a TransientLayout).
+    The layout is stored as a tuple of (name, kind, default) and each call receives
+    its own Param objects, because they are filled in during the binding.
+    """
+
+    def __init__(self) -> None:
+        self._layouts: WeakKeyDictionary = WeakKeyDictionary()
+        self._lock = Lock()
+
+    def get(self, func: Callable, remove_first: bool = True) -> Dict[str, Param]:
+        return params_from_layout(self.get_layout(func, remove_first))
+
+    def get_layout(self, func: Callable, remove_first: bool = True) -> ParamsLayout:
+        try:
+            with self._lock:
+                layouts = self._layouts.get(func)
+                if layouts is not None and remove_first in layouts:
+                    return layouts[remove_first]
+        except TypeError:
+            return TransientLayout(ParamsLayoutCache._parse(func, remove_first))
+
+        layout = ParamsLayoutCache._parse(func, remove_first)
+        with self._lock:
+            self._layouts.setdefault(func, {})[remove_first] = layout
+        return layout
+
+    def clear(self) -> None:
+        with self._lock:
+            self._layouts.clear()
+
+    def __len__(self) -> int:
+        return len(self._layouts)
+
+    @staticmethod
+    def _parse(func: Callable, remove_first: bool) -> ParamsLayout:
+        params = OpProcessor._get_params_wo_self(func, remove_first)
+        return tuple((name, param.kind.name, param.default)
+                     for name, param in params.items())
+
+
 class OpProcessor:
+    _params_cache = ParamsLayoutCache()
+
     @staticmethod
     def process_one_operation(
             operation: "Operation",
@@ -21,53 +75,95 @@ class OpProcessor:
             rw_inst: Dict[str, Any],
             op_stack_name: Optional[str] = None,
             hide_init_inf_from_logs: bool = False,
-            check_type_strategy_all: bool = True) -> Tuple[Optional[Any], Optional[Tuple]]:
+            check_type_strategy_all: bool = True,
+            check_types: bool = True) -> Tuple[Optional[Any], Optional[Tuple]]:
 
         OpProcessor._is_it_operation_check(op_stack_name, operation)
+        return OpProcessor.process_call(
+            operation._obj._get_call_spec(), input_data, rw_inst, op_stack_name,
+            hide_init_inf_from_logs, check_type_strategy_all, check_types)
+
+    @staticmethod
+    def process_call(
+            call: "CallSpec",
+            input_data: Tuple,
+            rw_inst: Dict[str, Any],
+            op_stack_name: Optional[str] = None,
+            hide_init_inf_from_logs: bool = False,
+            check_type_strategy_all: bool = True,
+            check_types: bool = True) -> Tuple[Optional[Any], Optional[Tuple]]:
+        """Execute the call described by the snapshot without modifying it.
+
+        The instance created by the class initialization stays local to the call,
+        so the same CallSpec can be processed repeatedly.
+        """
+        execute, rem_data = OpProcessor.prepare_call(
+            call, input_data, rw_inst, op_stack_name,
+            hide_init_inf_from_logs, check_type_strategy_all, check_types)
+        return execute(), rem_data
+
+    @staticmethod
+    def prepare_call(
+            call: "CallSpec",
+            input_data: Tuple,
+            rw_inst: Dict[str, Any],
+            op_stack_name: Optional[str] = None,
+            hide_init_inf_from_logs: bool = False,
+            check_type_strategy_all: bool = True,
+            check_types: bool = True) -> Tuple[Callable[[], Any], Optional[Tuple]]:
+        """Bind the arguments of the call and return it unexecuted with the remaining data.
+
+        If a method is called on a class, the class is initialized here,
+        because the arguments of the method are bound after the initialization.
+        """
         rem_data = None
         internal_init_flag = False
+        instance = call.instance
 
-        if operation._obj._function:
-            params_wo_self = OpProcessor._get_params_wo_self(
-                operation._obj._function, False)
+        if call.function:
+            layout = OpProcessor._get_layout(call.function, False)
             args, kwargs, rem_data = OpProcessor._get_args_kwargs(
-                op_stack_name, *operation._obj._func_args_kwargs,
-                params_wo_self, input_data, rw_inst,
-                hide_init_inf_from_logs, check_type_strategy_all)
-            return OpProcessor._call_func_or_method(
-                op_stack_name, operation._obj._function, args, kwargs), rem_data
-
-        elif operation._obj._class:
-            params_wo_self = OpProcessor._get_params_wo_self(
-                operation._obj._class.__init__) if "__init__" in vars(
-                operation._obj._class) else OpProcessor._get_params_wo_self(
-                operation._obj._class, False)
+                op_stack_name, *call.func_args_kwargs,
+                layout, input_data, rw_inst,
+                hide_init_inf_from_logs, check_type_strategy_all, check_types)
+            return partial(OpProcessor._call_func_or_method,
+                           op_stack_name, call.function, args, kwargs), rem_data
+
+        elif call.cls:
+            layout = OpProcessor._get_layout(
+                call.cls.__init__) if "__init__" in vars(
+                call.cls) else OpProcessor._get_layout(call.cls, False)
             args, kwargs, rem_data = OpProcessor._get_args_kwargs(
-                op_stack_name, *operation._obj._init_args_kwargs,
-                params_wo_self, input_data, rw_inst,
-                hide_init_inf_from_logs, check_type_strategy_all)
-            operation._obj._instance = OpProcessor._initialize_class(
-                op_stack_name, operation._obj._class, args, kwargs)
+                op_stack_name, *call.init_args_kwargs,
+                layout, input_data, rw_inst,
+                hide_init_inf_from_logs, check_type_strategy_all, check_types)
+            if not call.method:
+                return partial(OpProcessor._initialize_class,
+                               op_stack_name, call.cls, args, kwargs), rem_data
+            instance = OpProcessor._initialize_class(
+                op_stack_name, call.cls, args, kwargs)
             internal_init_flag = True
 
-        if operation._obj._instance and not operation._obj._method:
-            return operation._obj._instance, rem_data
+        if instance and not call.method:
+            return partial(OpProcessor._return_instance, instance), rem_data
         else:
             rem_data = input_data if not internal_init_flag else rem_data
             rem_data = () if rem_data is None else rem_data
-            method = operation._obj._instance.__getattribute__(
-                operation._obj._method)
-            params_wo_self = OpProcessor._get_params_wo_self(
+            method = instance.__getattribute__(call.method)
+            layout = OpProcessor._get_layout(
                 method.__func__) if ismethod(
-                method) else OpProcessor._get_params_wo_self(
-                method, remove_first=False)
+                method) else OpProcessor._get_layout(method, False)
             args, kwargs, rem_data = OpProcessor._get_args_kwargs(
-                op_stack_name, *operation._obj._meth_args_kwargs,
-                params_wo_self, rem_data, rw_inst,
-                hide_init_inf_from_logs, check_type_strategy_all)
+                op_stack_name, *call.meth_args_kwargs,
+                layout, rem_data, rw_inst,
+                hide_init_inf_from_logs, check_type_strategy_all, check_types)
 
-            return OpProcessor._call_func_or_method(
-                op_stack_name, method, args, kwargs), rem_data
+            return partial(OpProcessor._call_func_or_method,
+                           op_stack_name, method, args, kwargs), rem_data
+
+    @staticmethod
+    def _return_instance(instance: Any) -> Any:
+        return instance
 
     @staticmethod
     def _is_it_operation_check(stack: str, operation: Any):
@@ -80,18 +176,24 @@ class OpProcessor:
             op_stack_name: str,
             args: Tuple,
             kwargs: Dict[str, Any],
-            params_wo_self: Dict[str, Parameter],
+            layout: ParamsLayout,
             input_data: Tuple,
             rw_inst: Dict[str, Any],
             hide_init_inf_from_logs: bool,
-            check_type_strategy_all: bool = True):
+            check_type_strategy_all: bool = True,
+            check_types: bool = True):
         args = OpProcessor._expand_special_args(
             args, rw_inst)
         kwargs = OpProcessor._expand_special_kwargs(
             kwargs, rw_inst)
-        return InitCore.get_args_kwargs(
-            op_stack_name, params_wo_self, args, kwargs,
-            input_data, hide_init_inf_from_logs, check_type_strategy_all)
+        return InitCore.bind(
+            op_stack_name, layout, args, kwargs,
+            input_data, hide_init_inf_from_logs, check_type_strategy_all, check_types)
+
+    @staticmethod
+    def _get_layout(func: Callable, remove_first: bool = True) -> ParamsLayout:
+        """Return the parameters layout of the callable, the signature is parsed only once."""
+        return OpProcessor._params_cache.get_layout(func, remove_first)
 
     @staticmethod
     def _get_params_wo_self(func: Callable, remove_first: bool = True) -> Dict[str, Parameter]:
@@ -179,24 +281,17 @@ class OpProcessor:
         kwargs = {"arg1": MandatoryArgTypeContainer("ja")}
         return_result = {"arg1": JobArgs()}
         """
+        new_kwargs = {}
         for param_name, param in kwargs.items():
             if is_it_init_arg_type(param) and param.param_link:
-                splited_arg = param.param_link.split(".")
-                result = find_rw_inst(splited_arg[0], rw_inst)
+                result = rw_inst.get(param.param_path.alias)
                 if result:
-                    if len(splited_arg) == 1:
-                        param.par_value = result
-                        kwargs[param_name] = param
-                    else:
-                        for field in splited_arg[1:]:
-                            result = result.__getattribute__(field)
-                        param.par_value = result
-                        kwargs[param_name] = param
+                    param = param._bind(param.param_path.get_from(result))
                 else:
-                    param.par_value = PARAMETER_WAS_NOT_EXPANDED
-                    kwargs[param_name] = param
+                    param = param._bind(PARAMETER_WAS_NOT_EXPANDED)
+            new_kwargs[param_name] = param
 
-        return kwargs
+        return new_kwargs
 
     @staticmethod
     def _expand_special_args(args: Tuple, rw_inst: Dict[str, Any]) -> Tuple:
@@ -234,29 +329,32 @@ class OpProcessor:
         new_args = []
         for arg in args:
             if is_it_init_arg_type(arg) and arg.param_link:
-                splited_arg = arg.param_link.split(".")
-                result = find_rw_inst(splited_arg[0], rw_inst)
+                result = rw_inst.get(arg.param_path.alias)
                 if result:
-                    if len(splited_arg) == 1:
-                        arg.par_value = result
-                        new_args.append(arg)
-                        continue
-                    else:
-                        for field in splited_arg[1:]:
-                            result = result.__getattribute__(field)
-                        arg.par_value = result
-                        new_args.append(arg)
-                        continue
+                    arg = arg._bind(arg.param_path.get_from(result))
                 else:
-                    arg.par_value = PARAMETER_WAS_NOT_EXPANDED
-                    new_args.append(arg)
-
+                    arg = arg._bind(PARAMETER_WAS_NOT_EXPANDED)
             new_args.append(arg)
 
         return tuple(new_args)
 
 
+@dataclass(frozen=True)
+class CallSpec:
+    """Immutable snapshot of the call described by a CallObject."""
+    function: Optional[Callable] = None
+    cls: Optional[Type] = None
+    instance: Any = None
+    method: Optional[str] = None
+    func_args_kwargs: Optional[Tuple[Tuple, Dict[str, Any]]] = None
+    init_args_kwargs: Optional[Tuple[Tuple, Dict[str, Any]]] = None
+    meth_args_kwargs: Optional[Tuple[Tuple, Dict[str, Any]]] = None
+
+
 class CallObject:
+    __slots__ = ("_cls_func_inst", "_class", "_function", "_instance", "_method",
+                 "_func_args_kwargs", "_init_args_kwargs", "_meth_args_kwargs", "_call_counter")
+
     def __init__(self,
                  cls_func_inst: Union[Callable, Type, Any]) -> None:
         self._cls_func_inst = cls_func_inst
@@ -287,6 +385,9 @@ class CallObject:
         return self
 
     def __getattr__(self, name: str) -> "CallObject":
+        if name.startswith("__") and name.endswith("__"):
+            # Special lookups (pickle, copy) must not be taken for the method name
+            raise AttributeError(name)
         self._method = name
         return self
 
@@ -314,25 +415,30 @@ class CallObject:
         string = "t.bb_class.field_contain_instance"
         rw_inst = {"t": Transit()}                        ->  AA()
         """
-        splited_str = string.split(".")
+        path = parse_attr_path(string)
 
-        result = find_rw_inst(splited_str[0], rw_inst)
+        result = find_rw_inst(path.alias, rw_inst)
         if not result:
             existing_aliases = f"{list(rw_inst)}" if rw_inst else f"{rw_inst}"
-            raise TypeError(f'Operation: {stack}. No such alias "{splited_str[0]}" '
+            raise TypeError(f'Operation: {stack}. No such alias "{path.alias}" '
                             f'in rw_inst. Existing_aliases: {existing_aliases}.')
 
-        class_name = result.__class__.__name__
-
-        for field in splited_str[1: len(splited_str)]:
-            try:
-                result = result.__getattribute__(field)
-            except AttributeError:
-                raise AttributeError(
-                    f'Operation: {stack}. The RW class "{class_name}" '
-                    f'does not have attribute "{field}".')
-
-        return result
+        try:
+            return path.get_from(result)
+        except AttributeError:
+            raise AttributeError(
+                f'Operation: {stack}. The RW class "{result.__class__.__name__}" '
+                f'does not have attribute "{path.failed_field(result)}".')
+
+    def _get_call_spec(self) -> CallSpec:
+        return CallSpec(
+            function=self._function,
+            cls=self._class,
+            instance=self._instance,
+            method=self._method,
+            func_args_kwargs=self._func_args_kwargs,
+            init_args_kwargs=self._init_args_kwargs,
+            meth_args_kwargs=self._meth_args_kwargs)
 
     def _get_instance_from_string(self, op_stack_name: str, rw_inst: Dict[str, Any]):
         if isinstance(self._instance, str):
@@ -365,14 +471,26 @@ class CallObject:
 
 
 class Operation:
+    __slots__ = ("_obj", "_op_name", "_def_args", "_assign", "_assign_paths", "_hide_init_inf_from_logs",
+                 "_check_type_strategy_all", "_type_check_mode", "_type_check_gate",
+                 "_distribute_input_data", "_parallel_distribution", "_distribution_workers",
+                 "_stop_distribution", "_burn_rem_args",
+                 "_raise_err_if_empty_data", "_rw_inst", "_rw_inst_from_option",
+                 "_branch_stack", "_operation_stack", "_last_op_stack")
+
     def __init__(self, call_object: CallObject) -> None:
         self._obj = call_object
         self._op_name: Optional[str] = None
         self._def_args: Optional[Tuple] = None
         self._assign: Optional[Tuple[str]] = None
+        self._assign_paths: Optional[Tuple[AttrPath, ...]] = None
         self._hide_init_inf_from_logs: Optional[bool] = None
         self._check_type_strategy_all: Optional[bool] = None
+        self._type_check_mode: Optional[Tuple[str, Optional[Union[int, float]]]] = None
+        self._type_check_gate: Optional[TypeCheckGate] = None
         self._distribute_input_data: bool = False
+        self._parallel_distribution: bool = False
+        self._distribution_workers: Optional[int] = None
         self._stop_distribution: bool = False
         self._burn_rem_args: bool = False
         self._raise_err_if_empty_data: bool = False
@@ -398,6 +516,7 @@ class Operation:
 
     def assign(self, *args: str) -> "Operation":
         self._assign = args
+        self._assign_paths = None
         return self
 
     def hide_init_inf_from_logs(self, value: bool) -> "Operation":
@@ -408,11 +527,29 @@ class Operation:
         self._check_type_strategy_all = value
         return self
 
+    def type_check_mode(self, mode: str, value: Optional[Union[int, float]] = None) -> "Operation":
+        self._type_check_mode = (mode, value)
+        return self
+
     @property
     def distribute_input_data(self) -> "Operation":
         self._distribute_input_data = True
         return self
 
+    def parallel_distribution(self, workers: Optional[int] = None) -> "Operation":
+        """Same as distribute_input_data, but the distributed operations are called concurrently.
+
+        The arguments of every distributed operation are still bound one by one,
+        then the calls run on a pool of workers threads (by default one per
+        distributed operation) and the results are joined in the declared order
+        when the distribution is stopped. The distributed operations must not
+        depend on each other (e.g. read the fields assigned by each other).
+        """
+        self._distribute_input_data = True
+        self._parallel_distribution = True
+        self._distribution_workers = workers
+        return self
+
     @property
     def stop_distribution(self) -> "Operation":
         self._stop_distribution = True
@@ -469,18 +606,25 @@ class Operation:
         OptionsChecker.check_stop_distribution(
             self._operation_stack, self._stop_distribution,
             self._distribute_input_data)
+        if self._type_check_gate is None:
+            self._type_check_gate = OptionsChecker.get_type_check_gate(
+                self._operation_stack, self._type_check_mode)
 
         result, rem_data = OpProcessor.process_one_operation(
             self, input_data, self._rw_inst,
             self._operation_stack, self._hide_init_inf_from_logs,
-            self._check_type_strategy_all)
+            self._check_type_strategy_all,
+            self._type_check_gate.should_check())
 
         if self._burn_rem_args:
             rem_data = None
 
         if self._assign is not None:
+            if self._assign_paths is None:
+                self._assign_paths = OptionsChecker.get_assign_paths(
+                    self._operation_stack, self._assign)
             return Assigner.do_assign(
-                self._operation_stack, self._assign,
+                self._operation_stack, self._assign_paths,
                 self._rw_inst, result), None
 
         return result, rem_data
@@ -496,28 +640,49 @@ class OptionsChecker:
                 f"must be in string format.")
 
     @staticmethod
-    def check_assign_option(
+    def check_assign_aliases(
             stack: str,
-            fields_for_assign: Optional[Tuple[str, ...]],
+            paths: Tuple[AttrPath, ...],
             rw_inst: Dict[str, Any]) -> None:
+        for path in paths:
+            if path.alias not in rw_inst:
+                raise AssignmentError(
+                    f"Operation: {stack}. Alias \"{path.alias}\" "
+                    f"is missing from rw_inst. Assignment not possible.")
+
+    @staticmethod
+    def check_assign_fields(
+            stack: str,
+            fields_for_assign: Optional[Tuple[str, ...]]) -> None:
+        """Check the part of the assign option that does not depend on rw_inst."""
         if fields_for_assign is not None:
             if not all(map(lambda x: isinstance(x, str), fields_for_assign)):
                 raise TypeError(
                     f"Operation: {stack}. All values to assign must be string only.")
-            aliases = list(map(lambda x: x.split(".")[0], fields_for_assign))
-            for alias in aliases:
-                if alias not in rw_inst:
-                    raise AssignmentError(
-                        f"Operation: {stack}. Alias \"{alias}\" "
-                        f"is missing from rw_inst. Assignment not possible.")
-            fields = list(map(lambda x: x.split(".")[1:], fields_for_assign))
-            for fields_list in fields:
-                for field in fields_list:
+            for path in map(parse_attr_path, fields_for_assign):
+                for field in path.fields:
                     if not field.isidentifier():
                         raise AssignmentError(
                             f'Operation: {stack}.\nPart of string reference to '
                             f'an object "{field}" cannot be a python field.')
 
+    @staticmethod
+    def get_assign_paths(
+            stack: str,
+            fields_for_assign: Optional[Tuple[str, ...]]) -> Optional[Tuple[AttrPath, ...]]:
+        """Validate the assign option and parse its strings once."""
+        if fields_for_assign is None:
+            return None
+        OptionsChecker.check_assign_fields(stack, fields_for_assign)
+        return tuple(map(parse_attr_path, fields_for_assign))
+
+    @staticmethod
+    def check_distribution_workers(stack: str, workers: Optional[int]) -> None:
+        if workers is not None and (
+                not isinstance(workers, int) or isinstance(workers, bool) or workers < 1):
+            raise IncorrectParameterError(
+                f"Operation: {stack}. The number of workers must be a positive int.")
+
     @staticmethod
     def check_burn_rem_args_op(
             stack: str, burn_rem_args: bool,
@@ -541,6 +706,40 @@ class OptionsChecker:
                 f"Because distribution use remaining args.")
 
 
+    @staticmethod
+    def get_type_check_gate(
+            stack: str,
+            type_check_mode: Optional[Tuple[str, Optional[Union[int, float]]]]) -> TypeCheckGate:
+        if type_check_mode is None:
+            return TypeCheckGate()
+        mode, value = OptionsChecker.check_type_check_mode(stack, type_check_mode)
+        return TypeCheckGate(mode, value)
+
+    @staticmethod
+    def check_type_check_mode(
+            stack: str,
+            type_check_mode: Tuple[str, Optional[Union[int, float]]]) -> Tuple[str, Optional[Union[int, float]]]:
+        mode, value = type_check_mode
+        if mode not in TYPE_CHECK_MODES:
+            raise IncorrectParameterError(
+                f"Operation: {stack}. Unknown type check mode: {mode}. "
+                f"Available modes: {TYPE_CHECK_MODES}.")
+        if mode == "first_run":
+            value = 1 if value is None else value
+            if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                raise IncorrectParameterError(
+                    f"Operation: {stack}. For the first_run type check mode the value "
+                    f"must be a non-negative int (number of checked runs).")
+        elif mode == "sampled":
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or not 0 <= value <= 1:
+                raise IncorrectParameterError(
+                    f"Operation: {stack}. For the sampled type check mode the value "
+                    f"must be a fraction of checked runs from 0 to 1.")
+        elif value is not None:
+            raise IncorrectParameterError(
+                f"Operation: {stack}. The {mode} type check mode does not take a value.")
+        return mode, value
+
     @staticmethod
     def check_stop_distribution(
             stack: str, stop_distribution: bool,
@@ -555,19 +754,20 @@ class Assigner:
     @staticmethod
     def do_assign(
             stack: str,
-            fields_for_assign: Tuple[str, ...],
+            assign_paths: Tuple[AttrPath, ...],
             rw_inst: Dict[str, Any],
             result: Optional[Any]):
-        OptionsChecker.check_assign_option(stack, fields_for_assign, rw_inst)
-        Assigner._validate_result(stack, result, fields_for_assign)
-        kw = {key: rw_inst[key.split(".")[0]] for key in fields_for_assign}
-        return assign(*to_tuple(result), **kw)
+        """The paths are the assign option parsed by OptionsChecker.get_assign_paths."""
+        OptionsChecker.check_assign_aliases(stack, assign_paths, rw_inst)
+        Assigner._validate_result(stack, result, assign_paths)
+        return assign_to_paths(
+            to_tuple(result), [(path, rw_inst[path.alias]) for path in assign_paths])
 
     @staticmethod
     def _validate_result(
             stack: str,
             result: Optional[Any],
-            fields_for_assign: Tuple[str, ...]) -> None:
+            fields_for_assign: Tuple[AttrPath, ...]) -> None:
         if result is None:
             raise AssignmentError(
                 f"Operation: {stack}. The result of the operation is None. "
@@ -1,16 +1,22 @@
 from inspect import Parameter
 from typing import TypeVar, Union, Optional, Tuple, Generic
 
+from .utils.common import AttrPath, parse_attr_path
+
 
 T = TypeVar('T')
 
 
 class MandatoryArgTypeContainer(Generic[T]):
+    __slots__ = ("link_or_pos", "is_it_seq_ident_types", "number_position",
+                 "param_link", "param_path", "par_type", "par_value")
+
     def __init__(self, link_or_pos: Union[int, str] = None, seq: bool = False):
         self.link_or_pos = link_or_pos
         self.is_it_seq_ident_types = seq
         self.number_position: Optional[int] = None
         self.param_link: Optional[str] = None
+        self.param_path: Optional[AttrPath] = None
         self._parse_link_or_pos()
         self.par_type = Parameter.empty
         self.par_value = Parameter.empty
@@ -18,6 +24,7 @@ class MandatoryArgTypeContainer(Generic[T]):
     def _parse_link_or_pos(self) -> None:
         if isinstance(self.link_or_pos, str):
             self.param_link = self.link_or_pos
+            self.param_path = parse_attr_path(self.link_or_pos)
         elif isinstance(self.link_or_pos, int):
             self.number_position = self.link_or_pos
 
@@ -37,6 +44,18 @@ class MandatoryArgTypeContainer(Generic[T]):
         self.par_type = par_type
         return self
 
+    def _bind(self, par_value) -> "MandatoryArgTypeContainer":
+        """Return a copy holding the value of the current run.
+
+        The declared container is never changed during a run,
+        so it can be shared between branches, runs and threads.
+        """
+        bound = object.__new__(type(self))
+        for name in MandatoryArgTypeContainer.__slots__:
+            object.__setattr__(bound, name, getattr(self, name))
+        bound.par_value = par_value
+        return bound
+
 
 class OptionalArgTypeContainer(MandatoryArgTypeContainer, Generic[T]):
-    pass
+    __slots__ = ()
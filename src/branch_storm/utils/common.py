@@ -1,6 +1,48 @@
+from functools import lru_cache
+from operator import attrgetter
 from typing import Any, Dict, Optional, Type, Tuple
 
-from ..default.rw_classes import Values, Variables
+from ..default.rw_classes import Values, Variables, new_layer
+
+
+class AttrPath:
+    """Parsed string reference to an object stored in rw_inst: "alias.field1.field2".
+
+    The string is split once, the fields are read with operator.attrgetter.
+    """
+    __slots__ = ("path", "alias", "fields", "_get_fields", "_get_parent")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.alias, *fields = path.split(".")
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self._get_fields = attrgetter(".".join(fields)) if fields else None
+        self._get_parent = attrgetter(".".join(fields[:-1])) if len(fields) > 1 else None
+
+    def __repr__(self) -> str:
+        return f"AttrPath({self.path!r})"
+
+    def get_from(self, obj: Any) -> Any:
+        """Return the object the fields of the path lead to, starting from obj (the alias object)."""
+        return obj if self._get_fields is None else self._get_fields(obj)
+
+    def set_on(self, obj: Any, value: Any) -> None:
+        """Set the value to the last field of the path, starting from obj (the alias object)."""
+        parent = obj if self._get_parent is None else self._get_parent(obj)
+        setattr(parent, self.fields[-1], value)
+
+    def failed_field(self, obj: Any) -> Optional[str]:
+        """Return the first field that cannot be read starting from obj."""
+        for field in self.fields:
+            try:
+                obj = getattr(obj, field)
+            except AttributeError:
+                return field
+
+
+@lru_cache(maxsize=4096)
+def parse_attr_path(path: str) -> AttrPath:
+    return AttrPath(path)
 
 
 def find_rw_inst(string: str, rw_inst: Dict[str, Any]) -> Optional[Type]:
@@ -17,23 +59,24 @@ def find_rw_inst(string: str, rw_inst: Dict[str, Any]) -> Optional[Type]:
             return rw_inst[alias]
 
 
-def renew_instance(
-        stack: str,
-        old_rw_inst: Dict[str, Any],
-        rw_class: Type) -> Dict[str, Any]:
+def renew_instance(old_rw_inst: Dict[str, Any], rw_class: Type) -> Dict[str, Any]:
     for alias, rw_inst in old_rw_inst.items():
         if isinstance(rw_inst, rw_class):
-            new_values = rw_class()
-            new_values._op_stack_name = stack
-            for field, value in rw_inst.__dict__.items():
-                setattr(new_values, field, value)
-            return {alias: new_values}
+            return {alias: new_layer(rw_inst)}
+
+
+def layer_rw_inst(rw_inst: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Put a new layer over every Values/Variables instance, other instances are kept."""
+    if not rw_inst:
+        return rw_inst
+    return {alias: new_layer(inst) if isinstance(inst, (Values, Variables)) else inst
+            for alias, inst in rw_inst.items()}
 
 
 def renew_def_rw_inst(stack: str, rw_inst: Dict[str, Any]) -> Dict[str, Any]:
     if rw_inst:
-        return {**rw_inst, **renew_instance(stack, rw_inst, Values),
-                **renew_instance(stack, rw_inst, Variables)}
+        return {**rw_inst, **renew_instance(rw_inst, Values),
+                **renew_instance(rw_inst, Variables)}
     return rw_inst
 
 
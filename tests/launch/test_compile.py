@@ -0,0 +1,95 @@
+import re
+from dataclasses import dataclass, FrozenInstanceError
+from typing import Tuple
+
+import pytest
+
+from src.branch_storm.constants import STOP_CONSTANT
+from src.branch_storm.launch_operations.errors import EmptyBranchError, IncorrectParameterError
+from src.branch_storm.operation import Operation as op, CallObject as obj
+from src.branch_storm.branch import Branch as br
+from src.branch_storm.type_containers import MandatoryArgTypeContainer as m
+
+
+def plus_one(arg: int) -> int: return arg + 1
+def pass_two(arg1: int, arg2: int) -> Tuple[int, int]: return arg1, arg2
+def stop_if_negative(arg: int):
+    return STOP_CONSTANT if arg < 0 else arg
+
+
+class Counter:
+    def __init__(self, start: int):
+        self.start = start
+
+    def add(self, arg: int) -> int:
+        return self.start + arg
+
+
+@dataclass
+class Storage:
+    counter: Counter = None
+
+
+def test_compiled_plan_runs_many_times():
+    plan = br("job")[
+        obj(plus_one)(m[int]),
+        op(obj(plus_one)(m[int])).assign("val.stored"),
+        br("nested")[
+            obj(plus_one)(m("val.stored")[int]),
+            obj(Counter)(10).add(m[int]),
+        ],
+    ].compile()
+
+    assert [plan.run(num) for num in (0, 5, 10)] == [13, 18, 23]
+
+
+def test_compiled_plan_with_distribution_and_stop_constant():
+    plan = br("job")[
+        op(obj(pass_two)(m[int], m[int])),
+        op(obj(plus_one)(m[int])).distribute_input_data,
+        op(obj(stop_if_negative)(m[int])).stop_distribution,
+        obj(pass_two)(m[int], m[int])
+    ].compile()
+
+    assert plan.run((1, 2)) == (2, 2)
+    assert plan.run((1, -2)) == STOP_CONSTANT
+    assert plan.run((3, 4)) == (4, 4)
+
+
+def test_compiled_plan_external_instance_from_string():
+    plan = br("job")[
+        op(obj("s.counter").add(m[int])),
+    ].rw_inst({"s": Storage(Counter(5))}).compile()
+
+    assert plan.steps[0].operation_stack == 'job -> External instance from string: "s.counter"'
+    assert (plan.run(1), plan.run(2)) == (6, 7)
+
+
+def test_compile_does_not_consume_branch():
+    branch = br("job")[obj(plus_one)(m[int]), obj(plus_one)(m[int])]
+    plan = branch.compile()
+
+    assert plan.run(1) == 3
+    assert branch.run(5) == 7
+
+
+def test_compiled_plan_is_immutable():
+    plan = br("job")[obj(plus_one)(m[int])].compile()
+
+    assert plan.steps[0].operation_stack == "job -> plus_one"
+    with pytest.raises(FrozenInstanceError):
+        plan.br_name = "another"
+
+
+def test_compile_empty_branch_neg():
+    with pytest.raises(EmptyBranchError, match="Running a branch without operations is impossible."):
+        br("job")[br("nested")].compile()
+
+
+def test_compile_incorrect_name_neg():
+    with pytest.raises(IncorrectParameterError, match=re.escape(
+            "The last successful operation: job -> plus_one. The name passed")):
+        br("job")[
+            obj(plus_one)(m[int]),
+            op(obj(plus_one)(m[int])).op_name(111),
+        ].compile()
@@ -0,0 +1,151 @@
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Tuple
+
+import pytest
+
+from src.branch_storm.launch_operations.errors import AssignmentError, IncorrectParameterError
+from src.branch_storm.launch_operations.step_dependencies import PendingCalls, StepAccess, paths_overlap
+from src.branch_storm.operation import Operation as op, CallObject as obj
+from src.branch_storm.branch import Branch as br
+from src.branch_storm.type_containers import MandatoryArgTypeContainer as m
+from src.branch_storm.utils.common import parse_attr_path
+
+
+def sleep_and_return(arg: int) -> int:
+    time.sleep(arg / 100)
+    return arg
+def plus_one(arg: int) -> int: return arg + 1
+def pass_two(arg1: int, arg2: int) -> Tuple[int, int]: return arg1, arg2
+def return_none() -> None: return None
+
+
+class Store:
+    def __init__(self):
+        self.items = []
+
+    def add(self, item: int) -> int:
+        self.items.append(item)
+        return len(self.items)
+
+
+def get_branch(dag: bool):
+    branch = br("dag")[
+        op(obj(sleep_and_return)(m(1)[int])).burn_rem_args.assign("val.a"),
+        op(obj(sleep_and_return)(4)).assign("val.b"),
+        op(obj(sleep_and_return)(9)).assign("var.c"),
+        op(obj(plus_one)(m("val.b")[int])).assign("var.c"),
+        obj(pass_two)(m("val.b")[int], m("var.c")[int]),
+        op(obj(plus_one)(m(1)[int])).burn_rem_args.assign("val.d"),
+        br("nested")[obj(pass_two)(m("val.d")[int], m("var.c")[int])],
+    ]
+    return branch.dag_mode() if dag else branch
+
+
+def test_dag_mode_equals_sequential_run():
+    assert get_branch(False).run((2, 3)) == get_branch(True).run((2, 3)) == (5, 5)
+
+
+def test_dag_mode_runs_independent_operations_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def wait_for_others(arg: int) -> int:
+        barrier.wait()
+        return arg
+
+    actual_result = br("dag")[
+        op(obj(wait_for_others)(1)).assign("val.a"),
+        op(obj(wait_for_others)(2)).assign("val.b"),
+        op(obj(wait_for_others)(3)).assign("val.c"),
+        obj(pass_two)(m("val.a")[int], m("val.c")[int]),
+    ].dag_mode().run()
+
+    assert actual_result == (1, 3)
+
+
+def test_dag_mode_pool_is_reused_by_runs():
+    branch = get_branch(True)
+    threads_before = threading.active_count()
+    for _ in range(20):
+        assert branch.run((2, 3)) == (5, 5)
+
+    assert threading.active_count() - threads_before <= len(branch.compile().steps)
+    assert branch.compile().call_pool is branch.compile().call_pool
+
+
+def test_dag_mode_waits_for_whole_instance():
+    store = Store()
+    actual_result = br("dag")[
+        op(obj("st").add(1)).assign("val.a"),
+        op(obj("st").add(2)).assign("val.b"),
+        obj(pass_two)(m("val.a")[int], m("val.b")[int]),
+    ].rw_inst({"st": store}).dag_mode(workers=2).run()
+
+    assert actual_result == (1, 2)
+    assert store.items == [1, 2]
+
+
+def test_dag_mode_first_error_neg():
+    def fail(arg: int) -> int:
+        raise ValueError(f"Failed on {arg}")
+
+    with pytest.raises(ValueError, match="Failed on 1"):
+        br("dag")[
+            op(obj(fail)(1)).assign("val.a"),
+            op(obj(fail)(2)).assign("val.b"),
+            op(obj(plus_one)(3)).assign("val.c"),
+        ].dag_mode().run()
+
+
+def test_dag_mode_assignment_error_neg():
+    with pytest.raises(AssignmentError, match=re.escape(
+            "Operation: dag -> return_none. The result of the operation is None. Assignment is not possible.")):
+        br("dag")[
+            op(obj(return_none)()).assign("val.a"),
+            op(obj(plus_one)(3)).assign("val.b"),
+        ].dag_mode().run()
+
+
+@pytest.mark.parametrize("workers", [0, "2", True])
+def test_dag_mode_incorrect_workers_neg(workers):
+    with pytest.raises(IncorrectParameterError, match=re.escape(
+            "Operation: dag(branch). The number of workers must be a positive int.")):
+        br("dag")[obj(plus_one)(1)].dag_mode(workers).compile()
+
+
+@pytest.mark.parametrize(
+    ("first", "second", "expected_result"),
+    [
+        ("val.a", "val.a", True),
+        ("val.a", "val.a.b", True),
+        ("val", "val.a", True),
+        ("val.a", "val.b", False),
+        ("val.a", "var.a", False),
+    ],
+)
+def test_paths_overlap(first, second, expected_result):
+    assert paths_overlap(parse_attr_path(first), parse_attr_path(second)) is expected_result
+    assert paths_overlap(parse_attr_path(second), parse_attr_path(first)) is expected_result
+
+
+def test_step_access_from_call():
+    call = obj("var.obj").method(m("val.a.b")[int], 1, kw=m("st"))._get_call_spec()
+    access = StepAccess.from_call(call, (parse_attr_path("val.c"),))
+
+    assert [path.path for path in access.reads] == ["val.a.b"]
+    assert [path.path for path in access.uses] == ["var.obj", "st"]
+    assert [path.path for path in access.writes] == ["val.c"]
+
+
+def test_pending_calls_write_dependencies():
+    pending = PendingCalls()
+    future = Future()
+    pending.add(StepAccess(writes=(parse_attr_path("val.a"),)), future)
+
+    assert pending.write_dependencies(StepAccess(writes=(parse_attr_path("val.a.b"),))) == (future,)
+    assert pending.write_dependencies(StepAccess(writes=(parse_attr_path("val.b"),))) == ()
+    future.set_result(None)
+    pending.check_failed()
+    assert not pending
@@ -1,9 +1,13 @@
+import pickle
 import re
+import threading
+import time
 from typing import Tuple
 
 import pytest
 
-from src.branch_storm.launch_operations.errors import RemainingArgsFoundError
+from src.branch_storm.launch_operations.errors import DistributionError, IncorrectParameterError, \
+    RemainingArgsFoundError
 from src.branch_storm.operation import Operation as op, CallObject as obj
 from src.branch_storm.branch import Branch as br
 from src.branch_storm.type_containers import MandatoryArgTypeContainer as m
@@ -140,3 +144,123 @@ def test_remaining_args_found_neg():
             obj(return_1_2_3)(),
             obj(pass_one_arg)(m[int])
         ].run()
+
+
+def sleep_and_return(arg: int) -> int:
+    time.sleep(arg / 100)
+    return arg
+
+
+class Multiplier:
+    def __init__(self, factor: int):
+        self.factor = factor
+
+    def multiply(self, arg: int) -> int:
+        return self.factor * arg
+
+
+def test_parallel_distribution():
+    branch = br("trusted_to_enriched")[
+        op(obj(return_1_2_3)()).op_name("f1"),
+        op(obj(pass_one_arg)(m[int])).parallel_distribution().op_name("f2"),
+        op(obj(Multiplier)(10).multiply(m[int])).op_name("f3"),
+        op(obj(pass_one_arg)(m[int])).stop_distribution.op_name("f4"),
+        op(obj(pass_three_args)(m[int], m[int], m[int])).op_name("f5")
+    ]
+    plan = branch.compile()
+
+    assert plan.steps[1].distribution_pool.workers == 3
+    assert plan.steps[1].distribution_pool is plan.steps[3].distribution_pool
+    assert plan.steps[4].distribution_pool is None
+    assert plan.run() == plan.run() == (1, 20, 3)
+
+
+def test_parallel_distribution_runs_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def wait_for_others(arg: int) -> int:
+        barrier.wait()
+        return arg
+
+    actual_result = br("trusted_to_enriched")[
+        op(obj(wait_for_others)(m[int])).parallel_distribution(),
+        obj(wait_for_others)(m[int]),
+        obj(wait_for_others)(m[int]),
+    ].run((1, 2, 3))
+
+    assert actual_result == (1, 2, 3)
+
+
+def count_pool_threads() -> int:
+    return sum(thread.name.startswith("branch_storm_distribution") for thread in threading.enumerate())
+
+
+def test_parallel_distribution_pool_is_reused_by_runs():
+    branch = br("trusted_to_enriched")[
+        op(obj(pass_one_arg)(m[int])).parallel_distribution(),
+        obj(pass_one_arg)(m[int]),
+        op(obj(pass_one_arg)(m[int])).stop_distribution,
+    ]
+    threads_before = count_pool_threads()
+    for _ in range(20):
+        assert branch.run((1, 2, 3)) == (1, 2, 3)
+
+    assert count_pool_threads() - threads_before <= 3
+    assert branch.compile().steps[0].distribution_pool is branch.compile().steps[0].distribution_pool
+    assert pickle.loads(pickle.dumps(branch)).run((1, 2, 3)) == (1, 2, 3)
+
+
+def test_parallel_distribution_declared_order():
+    actual_result = br("trusted_to_enriched")[
+        op(obj(sleep_and_return)(m[int])).parallel_distribution(workers=2),
+        obj(sleep_and_return)(m[int]),
+        op(obj(sleep_and_return)(m[int])).stop_distribution,
+    ].run((20, 10, 1))
+
+    assert actual_result == (20, 10, 1)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_parallel_distribution_assign_values_option(parallel):
+    first_op = op(obj(pass_one_arg)(m[int]))
+    first_op = first_op.parallel_distribution() if parallel else first_op.distribute_input_data
+    actual_result = br("trusted_to_enriched")[
+        first_op,
+        obj(pass_one_arg)(m[int]),
+        op(obj(pass_one_arg)(m[int])).stop_distribution.assign("val.arg3"),
+        obj(pass_three_args)(m[int], m[int], m("val.arg3")[int])
+    ].run((1, 2, 3))
+
+    assert actual_result == (1, 2, 3)
+
+
+def test_parallel_distribution_error_neg():
+    def fail(arg: int) -> int:
+        raise ValueError(f"Failed on {arg}")
+
+    with pytest.raises(ValueError, match="Failed on 2"):
+        br("trusted_to_enriched")[
+            op(obj(pass_one_arg)(m[int])).parallel_distribution(),
+            obj(fail)(m[int]),
+            obj(fail)(m[int]),
+        ].run((1, 2, 3))
+
+
+def test_parallel_distribution_with_branch_neg():
+    with pytest.raises(DistributionError, match=re.escape(
+            "Operation: trusted_to_enriched -> pass_one_arg.\n"
+            "Only operations can be distributed in parallel,\n"
+            "but the branch trusted_to_enriched -> br1 was found before the stop.")):
+        br("trusted_to_enriched")[
+            op(obj(pass_one_arg)(m[int])).parallel_distribution(),
+            br("br1")[obj(pass_one_arg)(m[int])],
+        ].compile()
+
+
+@pytest.mark.parametrize("workers", [0, "2", True])
+def test_parallel_distribution_incorrect_workers_neg(workers):
+    with pytest.raises(IncorrectParameterError, match=re.escape(
+            "Operation: trusted_to_enriched -> pass_one_arg. The number of workers must be a positive int.")):
+        br("trusted_to_enriched")[
+            op(obj(pass_one_arg)(m[int])).parallel_distribution(workers),
+        ].compile()
@@ -1,3 +1,4 @@
+import sys
 from typing import Tuple
 
 import pytest
@@ -156,3 +157,13 @@ def test_process_one_branch():
         "Table: dim_term has been written."]
     assert actual_result is None
     written_tables = []
+
+
+def test_run_branch_longer_than_recursion_limit():
+    branch_len = sys.getrecursionlimit() * 2
+    branch = br("long_job")[
+        obj(return_int_one)(),
+        *[obj(get_int_arg_and_plus_one)(m[int]) for _ in range(branch_len)],
+    ].hide_init_inf_from_logs(True)
+
+    assert branch.run() == branch_len + 1
@@ -0,0 +1,93 @@
+import re
+import threading
+import time
+from itertools import count, islice
+
+import pytest
+
+from src.branch_storm.default.rw_classes import Values
+from src.branch_storm.launch_operations.errors import IncorrectParameterError
+from src.branch_storm.operation import Operation as op, CallObject as obj
+from src.branch_storm.branch import Branch as br
+from src.branch_storm.type_containers import MandatoryArgTypeContainer as m
+
+
+def plus_one(arg: int) -> int: return arg + 1
+def double(arg: int) -> int: return arg * 2
+def sleep_and_return(arg: int) -> int:
+    time.sleep(arg / 100)
+    return arg
+
+
+def get_branch():
+    return br("batch")[
+        obj(plus_one)(m[int]),
+        obj(double)(m[int]),
+    ]
+
+
+def test_run_many():
+    assert list(get_branch().run_many([(1,), (2,), (3,)])) == [4, 6, 8]
+
+
+def test_run_many_is_lazy():
+    taken = []
+
+    def inputs():
+        for num in count():
+            taken.append(num)
+            yield num
+
+    results = get_branch().run_many(inputs(), workers=2)
+
+    assert list(islice(results, 3)) == [2, 4, 6]
+    assert len(taken) <= 3 + 4
+    results.close()
+
+
+def test_run_many_compiles_once(monkeypatch):
+    branch = get_branch()
+    compile_calls = []
+    original_compile = branch.compile
+    monkeypatch.setattr(type(branch), "compile", lambda self: compile_calls.append(1) or original_compile())
+
+    assert list(branch.run_many(range(5))) == [2, 4, 6, 8, 10]
+    assert len(compile_calls) == 1
+
+
+@pytest.mark.parametrize(("ordered", "expected_result"), [(True, [30, 1, 10]), (False, [1, 10, 30])])
+def test_run_many_workers(ordered, expected_result):
+    branch = br("batch")[obj(sleep_and_return)(m[int])]
+
+    assert list(branch.run_many([30, 1, 10], ordered=ordered, workers=3)) == expected_result
+
+
+def test_run_many_workers_run_concurrently():
+    barrier = threading.Barrier(4, timeout=5)
+
+    def wait_for_others(arg: int) -> int:
+        barrier.wait()
+        return arg
+
+    branch = br("batch")[obj(wait_for_others)(m[int])]
+
+    assert sorted(branch.run_many(range(4), ordered=False, workers=4)) == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize("workers", [0, "2", True])
+def test_run_many_incorrect_workers_neg(workers):
+    with pytest.raises(IncorrectParameterError, match=re.escape(
+            "Operation: batch. The number of workers must be a positive int.")):
+        get_branch().run_many([(1,)], workers=workers)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_run_many_runs_have_own_rw_inst(workers):
+    val = Values()
+    branch = br("batch")[
+        op(obj(plus_one)(m[int])).assign("val.x"),
+        op(obj(sleep_and_return)(m("val.x"))),
+    ].rw_inst({"val": val})
+
+    assert sorted(branch.run_many(range(8), ordered=False, workers=workers)) == list(range(1, 9))
+    assert val.__dict__ == {"_op_stack_name": ""}
@@ -0,0 +1,117 @@
+import re
+import threading
+import time
+from itertools import count, islice
+from typing import Tuple
+
+import pytest
+
+from src.branch_storm.constants import STOP_CONSTANT
+from src.branch_storm.default.rw_classes import Variables
+from src.branch_storm.launch_operations.errors import IncorrectParameterError, RemainingArgsFoundError
+from src.branch_storm.operation import Operation as op, CallObject as obj
+from src.branch_storm.branch import Branch as br
+from src.branch_storm.type_containers import MandatoryArgTypeContainer as m
+
+
+def plus_one(arg: int) -> int: return arg + 1
+def pass_two(arg1: int, arg2: int) -> Tuple[int, int]: return arg1, arg2
+def stop_if_negative(arg: int):
+    return STOP_CONSTANT if arg < 0 else arg
+def fail_on_three(arg: int) -> int:
+    if arg == 3:
+        raise ValueError("Three")
+    return arg
+
+
+def get_branch():
+    return br("pipe")[
+        op(obj(pass_two)(m[int], m[int])),
+        op(obj(plus_one)(m[int])).distribute_input_data,
+        op(obj(stop_if_negative)(m[int])).stop_distribution,
+        op(obj(plus_one)(m[int])).burn_rem_args.assign("val.first"),
+        br("nested")[
+            obj(plus_one)(m("val.first")[int]),
+        ],
+    ]
+
+
+def test_run_pipelined_equals_run():
+    inputs = [(1, 2), (5, -1), (3, 4), (10, 20)]
+    expected_result = [get_branch().run(input_data) for input_data in inputs]
+
+    assert expected_result == [4, STOP_CONSTANT, 6, 13]
+    assert list(get_branch().run_pipelined(inputs)) == expected_result
+    assert list(get_branch().run_pipelined(inputs, queue_size=10)) == expected_result
+
+
+def test_run_pipelined_remaining_args_neg():
+    branch = br("pipe")[obj(pass_two)(m[int], m[int]), obj(plus_one)(m[int])]
+
+    with pytest.raises(RemainingArgsFoundError):
+        list(branch.run_pipelined([(1, 2)]))
+
+
+def test_run_pipelined_stages_overlap():
+    second_item_is_read = threading.Event()
+
+    def read(arg: int) -> int:
+        if arg == 1:
+            second_item_is_read.set()
+        return arg
+
+    def write(arg: int) -> int:
+        if arg == 0:
+            assert second_item_is_read.wait(timeout=5)
+        return arg
+
+    branch = br("pipe")[obj(read)(m[int]), obj(write)(m[int])]
+
+    assert list(branch.run_pipelined(range(3))) == [0, 1, 2]
+
+
+def test_run_pipelined_backpressure():
+    taken = []
+
+    def inputs():
+        for num in count():
+            taken.append(num)
+            yield num
+
+    results = br("pipe")[obj(plus_one)(m[int])].run_pipelined(inputs(), queue_size=2)
+
+    assert list(islice(results, 3)) == [1, 2, 3]
+    results.close()
+    assert len(taken) <= 3 + 2 * 2 + 2
+
+
+def test_run_pipelined_error_is_raised():
+    results = br("pipe")[obj(plus_one)(m[int]), obj(fail_on_three)(m[int])].run_pipelined(range(5))
+
+    assert next(results) == 1
+    assert next(results) == 2
+    with pytest.raises(ValueError, match="Three"):
+        next(results)
+
+
+@pytest.mark.parametrize("queue_size", [0, 1.5, False])
+def test_run_pipelined_incorrect_queue_size_neg(queue_size):
+    with pytest.raises(IncorrectParameterError, match=re.escape(
+            "Operation: pipe. The queue size must be a positive int.")):
+        br("pipe")[obj(plus_one)(m[int])].run_pipelined([1], queue_size=queue_size)
+
+
+def sleep_and_return(arg: int) -> int:
+    time.sleep(0.002)
+    return arg
+
+
+def test_run_pipelined_items_have_own_rw_inst():
+    var = Variables()
+    branch = br("pipe")[
+        op(obj(plus_one)(m[int])).assign("var.x"),
+        op(obj(sleep_and_return)(m("var.x"))),
+    ].rw_inst({"var": var})
+
+    assert list(branch.run_pipelined(range(8))) == list(range(1, 9))
+    assert var.__dict__ == {"_op_stack_name": ""}
@@ -0,0 +1,46 @@
+from src.branch_storm.default.rw_classes import Values, Variables
+from src.branch_storm.launch_operations.rw_inst_registry import RwInstRegistry
+
+
+class A:
+    pass
+
+
+class B(A):
+    pass
+
+
+class C:
+    pass
+
+
+def test_instances_of():
+    a, b, val = A(), B(), Values()
+    registry = RwInstRegistry({"a": a, "b": b, "val": val})
+
+    assert registry.instances_of(A) == {"a": a, "b": b}
+    assert registry.instances_of(B) == {"b": b}
+    assert registry.instances_of(Values) == {"val": val}
+    assert registry.instances_of(C) == {}
+
+
+def test_matching_aliases():
+    registry = RwInstRegistry({"a": A(), "b": B(), "var": Variables()})
+
+    assert registry.matching_aliases(B()) == ("b", "a")
+    assert registry.matching_aliases(A()) == ("a",)
+    assert registry.is_rw_instance(Variables()) is True
+    assert registry.is_rw_instance(C()) is False
+    assert registry.is_rw_instance(1) is False
+
+
+def test_reassign():
+    a, b, new_b = A(), B(), B()
+    rw_inst = {"a": a, "b": b}
+    registry = RwInstRegistry(rw_inst)
+    registry.reassign(new_b)
+
+    assert rw_inst == {"a": new_b, "b": new_b}
+    assert registry.matching_aliases(A()) == ()
+    assert set(registry.matching_aliases(B())) == {"a", "b"}
+    assert registry.instances_of(A) == {"a": new_b, "b": new_b}
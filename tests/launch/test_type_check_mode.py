@@ -0,0 +1,111 @@
+import pickle
+import re
+from typing import List
+
+import pytest
+
+from src.branch_storm.launch_operations.errors import IncorrectParameterError
+from src.branch_storm.operation import Operation as op, CallObject as obj
+from src.branch_storm.branch import Branch as br
+from src.branch_storm.type_containers import MandatoryArgTypeContainer as m
+
+
+def pass_list(arg: List[int]) -> List[int]: return arg
+def pass_arg(arg): return arg
+
+
+TYPE_ERR = re.escape(
+    "Operation: job -> pass_list.\n"
+    "Argument mismatches with their types were found:\n"
+    "Len: 1; Arg type map: {'arg': (<class 'list'>, typing.List[int])}")
+
+
+def test_type_check_mode_full_by_default_neg():
+    plan = br("job")[obj(pass_list)(m[List[int]])].compile()
+
+    with pytest.raises(TypeError, match=TYPE_ERR):
+        plan.run(([1, "2"],))
+
+
+def test_type_check_mode_off():
+    plan = br("job")[obj(pass_list)(m[List[int]])].type_check_mode("off").compile()
+
+    assert plan.run(([1, "2"],)) == [1, "2"]
+
+
+def test_type_check_mode_first_run():
+    plan = br("job")[
+        op(obj(pass_list)(m[List[int]])).type_check_mode("first_run", 2)
+    ].compile()
+
+    with pytest.raises(TypeError, match=TYPE_ERR):
+        plan.run(([1, "2"],))
+    assert plan.run(([1],)) == [1]
+    assert plan.run(([1, "2"],)) == [1, "2"]
+
+
+def test_type_check_mode_first_run_across_branch_runs():
+    branch = br("job")[obj(pass_list)(m[List[int]])].type_check_mode("first_run")
+
+    assert branch.run(([1],)) == [1]
+    assert branch.run(([1, "2"],)) == [1, "2"]
+    assert branch.compile().run(([1, "2"],)) == [1, "2"]
+
+
+def test_type_check_mode_run_branch_is_picklable():
+    branch = br("job")[obj(pass_list)(m[List[int]])].type_check_mode("first_run")
+    branch.run(([1],))
+    restored = pickle.loads(pickle.dumps(branch))
+
+    assert restored.run(([1, "2"],)) == [1, "2"]
+
+
+def test_type_check_mode_sampled():
+    never = br("job")[obj(pass_list)(m[List[int]])].type_check_mode("sampled", 0).compile()
+    always = br("job")[obj(pass_list)(m[List[int]])].type_check_mode("sampled", 1).compile()
+
+    assert never.run(([1, "2"],)) == [1, "2"]
+    with pytest.raises(TypeError, match=TYPE_ERR):
+        always.run(([1, "2"],))
+
+
+def test_type_check_mode_nested_inheritance():
+    plan = br("job")[
+        br("nested")[
+            obj(pass_list)(m[List[int]]),
+            op(obj(pass_list)(m[List[int]])).op_name("checked").type_check_mode("full"),
+        ],
+    ].type_check_mode("off").compile()
+
+    assert plan.steps[0].type_check_mode == ("off", None)
+    assert plan.steps[0].steps[0].type_check.mode == "off"
+    assert plan.steps[0].steps[1].type_check.mode == "full"
+
+
+def test_type_check_mode_arity_is_checked_when_off_neg():
+    with pytest.raises(ValueError, match=re.escape(
+            "Operation: job -> pass_arg. There was found args not used in call/init.")):
+        br("job")[obj(pass_arg)(m[int], m[int])].type_check_mode("off").run((1, 2))
+
+
+def test_type_check_mode_standalone_operation():
+    operation = op(obj(pass_list)(m[List[int]])).type_check_mode("first_run")
+
+    with pytest.raises(TypeError):
+        operation.run((["1"],))
+    assert operation.run((["1"],)) == (["1"], None)
+
+
+@pytest.mark.parametrize(
+    ("mode", "value", "message"),
+    [
+        ("partial", None, "Unknown type check mode: partial."),
+        ("first_run", 1.5, "the value must be a non-negative int"),
+        ("sampled", None, "must be a fraction of checked runs from 0 to 1."),
+        ("sampled", 2, "must be a fraction of checked runs from 0 to 1."),
+        ("off", 1, "The off type check mode does not take a value."),
+    ],
+)
+def test_type_check_mode_incorrect_value_neg(mode, value, message):
+    with pytest.raises(IncorrectParameterError, match=re.escape(message)):
+        br("job")[obj(pass_arg)(m[int])].type_check_mode(mode, value).compile()
@@ -0,0 +1,89 @@
+import re
+from typing import List, Optional
+
+import pytest
+
+from src.branch_storm.initialization_core import BindingPlanCache, InitCore, TransientLayout, params_from_layout
+from src.branch_storm.operation import ParamsLayoutCache
+from src.branch_storm.type_containers import MandatoryArgTypeContainer as m, OptionalArgTypeContainer as opt
+
+
+def func_with_params(arg1: int, arg2: str = "a", *args, kwarg1: float = 1.0, **kwargs): pass
+
+
+def get_layout():
+    return ParamsLayoutCache().get_layout(func_with_params, False)
+
+
+@pytest.mark.parametrize(
+    ("args", "kwargs", "input_data"),
+    [
+        ((m[int], m[str]), {}, (1, "s")),
+        ((m[int], opt[str]), {}, (1,)),
+        ((m[int],), {"kwarg1": opt[float]}, (1, 2.0, "rem")),
+        ((m(2)[int], m(1)[str]), {}, ("s", 1)),
+        ((m[int], "plain", m(seq=True)), {}, (1, 2, 3)),
+        ((5,), {"extra": m[List[int]]}, ([1, 2],)),
+        ((m[int],), {"kwarg1": opt[Optional[float]]}, (1, None)),
+    ],
+)
+def test_bind_equals_full_binding(args, kwargs, input_data):
+    layout = get_layout()
+    expected = InitCore.get_args_kwargs(
+        "stack", params_from_layout(layout), args, dict(kwargs), input_data)
+
+    assert InitCore.bind("stack", layout, args, dict(kwargs), input_data) == expected
+    assert InitCore.bind("stack", layout, args, dict(kwargs), input_data) == expected
+
+
+def test_binding_plan_is_reused():
+    cache = BindingPlanCache()
+    layout = get_layout()
+    first = cache.get(layout, (m[int],), {}, 1)
+
+    assert first is not None
+    assert cache.get(layout, (m[int],), {}, 1) is first
+    assert cache.get(layout, (m[int],), {}, 2) is not first
+    assert len(cache) == 2
+
+
+def test_binding_plan_not_available():
+    cache = BindingPlanCache()
+    layout = get_layout()
+
+    assert cache.get(layout, (m[int], m(seq=True)[int]), {}, 3) is None
+    assert cache.get(layout, (), {}, 0) is None
+    assert len(cache) == 2
+
+
+def test_binding_plan_cache_is_bounded():
+    cache = BindingPlanCache(maxsize=2)
+    layout = get_layout()
+    for len_input_data in range(1, 4):
+        cache.get(layout, (m[int],), {}, len_input_data)
+
+    assert len(cache) == 2
+
+
+class UnhashableCallable:
+    __hash__ = None
+
+    def __call__(self, arg: int) -> int:
+        return arg
+
+
+def test_binding_plan_not_cached_for_transient_layout():
+    cache = BindingPlanCache()
+    layout = ParamsLayoutCache().get_layout(UnhashableCallable(), False)
+
+    assert isinstance(layout, TransientLayout)
+    assert cache.get(layout, (m[int],), {}, 1) is None
+    assert len(cache) == 0
+    assert InitCore.bind("stack", layout, (m[int],), {}, (1,)) == ((1,), {}, None)
+
+
+def test_bind_type_mismatch_neg():
+    with pytest.raises(TypeError, match=re.escape(
+            "Operation: stack.\nArgument mismatches with their types were found:\n"
+            "Len: 1; Arg type map: {'arg1': (<class 'str'>, <class 'int'>)}")):
+        InitCore.bind("stack", get_layout(), (m[int],), {}, ("s",))
@@ -1,9 +1,10 @@
 from inspect import Parameter
-from typing import Union
+from typing import Any, Union
 
 import pytest
 
-from src.branch_storm.initialization_core import get_args_from_arg_type, get_first_element, replace_and_get_elem_by_pos
+from src.branch_storm.initialization_core import InitCore, InputCursor, get_args_from_arg_type, \
+    replace_and_get_elem_by_pos
 from src.branch_storm.type_containers import MandatoryArgTypeContainer as m, OptionalArgTypeContainer as opt
 
 
@@ -30,20 +31,6 @@ def test_get_args_from_arg_type(type_container, expected_result):
     assert actual_result == expected_result
 
 
-@pytest.mark.parametrize(
-    ("input_data", "expected_result"),
-    [
-        ((1, 2, 3), (1, (2, 3))),
-        ((1,), (1, ())),
-        ((), (Parameter.empty, ()))
-    ],
-)
-def test_get_element(input_data, expected_result):
-    actual_result = get_first_element(input_data)
-
-    assert actual_result == expected_result
-
-
 @pytest.mark.parametrize(
     ("input_data", "elem_pos", "expected_result"),
     [
@@ -61,3 +48,28 @@ def test_get_element(input_data, elem_pos, expected_result):
     actual_result = replace_and_get_elem_by_pos(input_data, elem_pos, "uniq_id")
 
     assert actual_result == expected_result
+
+
+def test_input_cursor():
+    cursor = InputCursor((1, 2, 3))
+
+    assert (cursor.next(), cursor.peek(), cursor.next()) == (1, 2, 2)
+    assert cursor.rest() == (3,)
+    assert (cursor.next(), cursor.next(), bool(cursor)) == (3, Parameter.empty, False)
+    assert cursor.rest() == ()
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        (m[int], m(seq=True)),
+        (m[int], m(seq=True)[int]),
+        (m[int], m(seq=True)[Any]),
+    ],
+)
+def test_consume_long_sequence(args):
+    input_data = tuple(range(50000))
+    params = {"arg1": Parameter("arg1", Parameter.POSITIONAL_OR_KEYWORD),
+              "args": Parameter("args", Parameter.VAR_POSITIONAL)}
+
+    assert InitCore.get_args_kwargs("stack", params, args, {}, input_data, True) == (input_data, {}, None)
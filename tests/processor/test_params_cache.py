@@ -0,0 +1,61 @@
+import gc
+
+from src.branch_storm.initialization_core import Param
+from src.branch_storm.operation import ParamsLayoutCache
+
+
+def func_with_params(arg1: int, *args, kwarg1: str = "a", **kwargs): pass
+
+
+class CallableWithoutWeakref:
+    __slots__ = ()
+
+    def __call__(self, arg1: int): pass
+
+
+class ClassWithInit:
+    def __init__(self, arg1: int, arg2=2): pass
+
+
+def test_params_layout_cache_returns_new_params_each_call():
+    cache = ParamsLayoutCache()
+    first = cache.get(func_with_params, False)
+    second = cache.get(func_with_params, False)
+
+    assert first == {
+        "arg1": Param(kind="POSITIONAL_OR_KEYWORD"),
+        "args": Param(kind="VAR_POSITIONAL"),
+        "kwarg1": Param(kind="KEYWORD_ONLY", def_val="a"),
+        "kwargs": Param(kind="VAR_KEYWORD")}
+    assert first == second
+    assert first["arg1"] is not second["arg1"]
+    assert len(cache) == 1
+
+
+def test_params_layout_cache_remove_first():
+    cache = ParamsLayoutCache()
+
+    assert cache.get(ClassWithInit.__init__) == {
+        "arg1": Param(kind="POSITIONAL_OR_KEYWORD"),
+        "arg2": Param(kind="POSITIONAL_OR_KEYWORD", def_val=2)}
+    assert list(cache.get(ClassWithInit.__init__, False)) == ["self", "arg1", "arg2"]
+    assert len(cache) == 1
+
+
+def test_params_layout_cache_drops_dynamic_callables():
+    cache = ParamsLayoutCache()
+    namespace = {}
+    exec("def dynamic_func(arg1: int): pass", namespace)
+    cache.get(namespace["dynamic_func"], False)
+
+    assert len(cache) == 1
+    del namespace
+    gc.collect()
+    assert len(cache) == 0
+
+
+def test_params_layout_cache_not_weakly_referenced_callable():
+    cache = ParamsLayoutCache()
+
+    assert cache.get(CallableWithoutWeakref(), False) == {"arg1": Param(kind="POSITIONAL_OR_KEYWORD")}
+    assert len(cache) == 0
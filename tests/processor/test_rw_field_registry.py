@@ -0,0 +1,139 @@
+import copy
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import pytest
+
+from src.branch_storm.default.rw_classes import MAX_LAYER_DEPTH, Values, Variables, new_layer
+
+
+@pytest.mark.parametrize("rw_class", [Values, Variables])
+def test_field_registry_is_per_instance(rw_class):
+    first, second = rw_class(), rw_class()
+    first.first_field = 1
+    second.second_field = field(default=2)
+
+    assert list(rw_class.__dataclass_fields__) == ["_op_stack_name"]
+    assert list(first.__dataclass_fields__) == ["_op_stack_name", "first_field"]
+    assert list(second.__dataclass_fields__) == ["_op_stack_name", "second_field"]
+    assert first.__dataclass_fields__["first_field"].default == 1
+    assert second.second_field == 2
+    assert first.__dict__ == {"_op_stack_name": "", "first_field": 1}
+
+
+@pytest.mark.parametrize("rw_class", [Values, Variables])
+def test_field_registry_parallel_writes(rw_class):
+    def fill(num):
+        rw_inst = rw_class()
+        for field_num in range(100):
+            setattr(rw_inst, f"field_{num}_{field_num}", field_num)
+        return rw_inst
+
+    with ThreadPoolExecutor(8) as executor:
+        instances = list(executor.map(fill, range(16)))
+
+    assert all(len(rw_inst.__dataclass_fields__) == 101 for rw_inst in instances)
+    assert list(rw_class.__dataclass_fields__) == ["_op_stack_name"]
+
+
+@pytest.mark.parametrize("rw_class", [Values, Variables])
+def test_attribute_access(rw_class):
+    rw_inst = rw_class()
+    rw_inst.int_storage = 1
+
+    assert rw_inst.int_storage == 1
+    assert rw_inst._op_stack_name == ""
+    assert rw_inst.__class__ is rw_class
+    with pytest.raises(AttributeError, match="^No such attribute in Variables$"):
+        rw_inst.not_exist
+    rw_inst._op_stack_name = "op"
+    with pytest.raises(AttributeError, match="^Operation: op. No such attribute in Variables$"):
+        rw_inst.__getstate__
+
+
+def test_values_write_once():
+    val = Values()
+    val.int_storage = 1
+
+    with pytest.raises(ValueError, match="^The value cannot be overwritten."):
+        val.int_storage = 2
+    with pytest.raises(TypeError, match="^The pos_args or pos_args structure being written has types"):
+        val.list_storage = [1]
+
+
+def test_new_layer_reads_through_and_writes_locally():
+    var = Variables()
+    var.shared = 1
+    var.overwritten = 1
+    child = new_layer(new_layer(var))
+    child.overwritten = 2
+    child.own = 3
+
+    assert (child.shared, child.overwritten, child.own) == (1, 2, 3)
+    assert var.__dict__ == {"_op_stack_name": "", "shared": 1, "overwritten": 1}
+    assert child.__dict__ == {"_op_stack_name": "", "shared": 1, "overwritten": 2, "own": 3}
+    assert list(child.__dataclass_fields__) == ["_op_stack_name", "shared", "overwritten", "own"]
+    with pytest.raises(AttributeError, match="^No such attribute in Variables$"):
+        child.not_exist
+
+
+def test_new_layer_values_write_once():
+    val = Values()
+    val.lookup = tuple(range(5))
+    child = new_layer(val)
+    child.own = 1
+
+    assert child.lookup == (0, 1, 2, 3, 4)
+    with pytest.raises(ValueError, match="^The value cannot be overwritten."):
+        child.lookup = ()
+    with pytest.raises(AttributeError):
+        val.own
+
+
+@dataclass
+class ValuesWithDefault(Values):
+    default_field: int = 1
+
+
+@dataclass
+class VariablesWithDefault(Variables):
+    default_field: int = 1
+
+
+@pytest.mark.parametrize("rw_class", [ValuesWithDefault, VariablesWithDefault])
+def test_new_layer_of_subclass_with_defaults(rw_class):
+    rw_inst = rw_class(default_field=5)
+    child = new_layer(rw_inst)
+
+    assert child.default_field == 5
+    assert child.__dict__ == {"_op_stack_name": "", "default_field": 5}
+    assert list(child.__dataclass_fields__) == ["_op_stack_name", "default_field"]
+
+
+def test_new_layer_depth_is_bounded():
+    var = Variables()
+    var.base = 0
+    layer = var
+    for num in range(3 * MAX_LAYER_DEPTH):
+        layer = new_layer(layer)
+        setattr(layer, f"field_{num}", num)
+
+    assert len(object.__getattribute__(layer, "_parent_fields")) <= MAX_LAYER_DEPTH
+    assert layer.base == 0
+    assert layer.field_0 == 0
+    assert len(layer.__dataclass_fields__) == 3 * MAX_LAYER_DEPTH + 2
+
+
+@pytest.mark.parametrize("rw_class", [ValuesWithDefault, VariablesWithDefault])
+def test_pickle_and_copy_flatten_layers(rw_class):
+    rw_inst = rw_class()
+    rw_inst.base = 1
+    child = new_layer(rw_inst)
+    child.own = (2,)
+
+    for restored in (pickle.loads(pickle.dumps(child)), copy.deepcopy(child)):
+        assert type(restored) is rw_class
+        assert restored.__dict__ == {"_op_stack_name": "", "default_field": 1, "base": 1, "own": (2,)}
+        assert object.__getattribute__(restored, "_parent_fields") == ()
+        assert list(restored.__dataclass_fields__) == ["_op_stack_name", "default_field", "base", "own"]
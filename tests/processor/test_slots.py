@@ -0,0 +1,30 @@
+import pytest
+
+from src.branch_storm.branch import Branch as br
+from src.branch_storm.initialization_core import Param
+from src.branch_storm.operation import Operation as op, CallObject as obj
+from src.branch_storm.type_containers import MandatoryArgTypeContainer as m, OptionalArgTypeContainer as opt
+
+
+def func(arg: int) -> int: return arg
+
+
+@pytest.mark.parametrize(
+    "instance",
+    [
+        Param(kind="POSITIONAL_ONLY"),
+        obj(func)(m[int]),
+        op(obj(func)(m[int])).op_name("name").assign("val.x").distribute_input_data,
+        br("branch")[obj(func)(m[int])].def_args(1),
+        m(1)[int],
+        opt("val.x"),
+    ],
+)
+def test_objects_have_no_instance_dict(instance):
+    assert type(instance).__dictoffset__ == 0
+
+
+def test_param_equality_and_repr():
+    assert Param(kind="KEYWORD_ONLY", def_val=1) == Param(kind="KEYWORD_ONLY", def_val=1)
+    assert Param(kind="KEYWORD_ONLY", def_val=1) != Param(kind="KEYWORD_ONLY", def_val=2)
+    assert repr(Param(value=1)).startswith("Param(arg=<class 'inspect._empty'>, type=")
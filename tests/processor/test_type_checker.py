@@ -0,0 +1,140 @@
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, List, NamedTuple, Optional, Protocol, Sequence, Tuple, TypedDict, Union
+
+import pytest
+from typeguard import TypeCheckError
+
+from src.branch_storm.initialization_core import TypeChecker, TypeVerdictCache, TypeVerdictCacheInfo, \
+    are_instances, get_type_checker, is_it_plain_class
+
+
+class NamedTupleClass(NamedTuple):
+    field: int
+
+
+class TypedDictClass(TypedDict):
+    field: int
+
+
+class ProtocolClass(Protocol):
+    def method(self): ...
+
+
+@dataclass
+class DataClass:
+    field: int = 1
+
+
+@pytest.mark.parametrize(
+    ("annotation", "expected_result"),
+    [
+        (int, True),
+        (DataClass, True),
+        (tuple, True),
+        (List[int], False),
+        (list[int], False),
+        (Any, False),
+        (NamedTupleClass, False),
+        (TypedDictClass, False),
+        (ProtocolClass, False),
+    ],
+)
+def test_is_it_plain_class(annotation, expected_result):
+    assert is_it_plain_class(annotation) is expected_result
+
+
+def test_type_verdict_cache_counters():
+    cache = TypeVerdictCache()
+
+    assert cache.is_instance(1, float) is True
+    assert cache.is_instance(2, float) is True
+    assert cache.is_instance("s", int) is False
+    assert cache.is_instance("a", int) is False
+    assert cache.cache_info() == TypeVerdictCacheInfo(hits=2, misses=2, maxsize=4096, currsize=2)
+    cache.clear()
+    assert cache.cache_info() == TypeVerdictCacheInfo(hits=0, misses=0, maxsize=4096, currsize=0)
+
+
+def test_type_verdict_cache_is_bounded():
+    cache = TypeVerdictCache(maxsize=2)
+    for value in (1, "s", 1.0):
+        cache.is_instance(value, int)
+
+    assert cache.cache_info().currsize == 2
+
+
+@pytest.mark.parametrize(
+    ("value", "annotation"),
+    [
+        (True, int),
+        (1, float),
+        (DataClass(), DataClass),
+        ([1, 2], List[int]),
+        (NamedTupleClass(1), NamedTupleClass),
+    ],
+)
+def test_type_checker_check(value, annotation):
+    TypeChecker.check(value, annotation)
+
+
+@pytest.mark.parametrize(
+    ("value", "annotation"),
+    [
+        ("s", int),
+        (1.0, int),
+        ([1, "s"], List[int]),
+        (NamedTupleClass("s"), NamedTupleClass),
+    ],
+)
+def test_type_checker_check_neg(value, annotation):
+    with pytest.raises(TypeCheckError):
+        TypeChecker.check(value, annotation)
+
+
+@pytest.mark.parametrize(
+    ("annotation", "value", "all_items", "expected_result"),
+    [
+        (List[int], [1, 2], True, True),
+        (List[int], [1, "2"], True, False),
+        (List[int], [1, "2"], False, True),
+        (List[int], (1, 2), True, False),
+        (Dict[str, float], {"a": 1, "b": 2.0}, True, True),
+        (Dict[str, float], {"a": 1.0, 2: 2.0}, True, False),
+        (Tuple[int, ...], (1, 2, 3), True, True),
+        (Tuple[int, ...], (1, "2"), True, False),
+        (Tuple[int, str], (1, "2"), False, True),
+        (Tuple[int, str], (1, 2), False, False),
+        (Optional[List[int]], None, True, True),
+        (Optional[List[int]], [None], True, False),
+        (Union[int, str], "s", True, True),
+        (Dict[str, List[int]], {"a": [1, "2"]}, True, False),
+        (Sequence[int], array("i", [1, 2]), True, True),
+        (Sequence[float], array("i", [1, 2]), True, True),
+        (Sequence[str], array("d", [1.0]), True, False),
+        (List[int], array("i", [1, 2]), True, False),
+    ],
+)
+def test_get_type_checker(annotation, value, all_items, expected_result):
+    assert get_type_checker(annotation)(value, all_items) is expected_result
+
+
+@pytest.mark.parametrize("annotation", [Tuple, List[NamedTupleClass], Optional[TypedDictClass]])
+def test_get_type_checker_not_supported(annotation):
+    assert get_type_checker(annotation) is None
+
+
+@pytest.mark.parametrize(
+    ("items", "expected_type", "expected_result"),
+    [
+        (list(range(100000)), int, True),
+        ([*range(100000), True], int, True),
+        ([*range(100000), "s"], int, False),
+        ([1, 2.0], float, True),
+        (array("q", range(100000)), int, True),
+        (array("d"), str, True),
+        ((), int, True),
+    ],
+)
+def test_are_instances(items, expected_type, expected_result):
+    assert are_instances(items, expected_type) is expected_result
@@ -1,11 +1,23 @@
+import os
+import pickle
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from inspect import Parameter
 from typing import Tuple, Optional
 
 import pytest
 
-from src.branch_storm.default.parallelism import create_init_data_sequence, parallelize_without_result
+from src.branch_storm.default.executors import AimdController, ConcurrencyGovernor, ExecutorRegistry, \
+    executor_registry
+from src.branch_storm.default.parallelism import create_init_data_sequence, parallelize_with_result_return, \
+    parallelize_without_result, parallelize_as_completed, thread_pool_as_completed, update_br_name
 from src.branch_storm.operation import Operation as op, CallObject as obj
 from src.branch_storm.branch import Branch as br, Branch
+from src.branch_storm.default.rw_classes import Values
+from src.branch_storm.launch_operations.errors import IncorrectParameterError
 from src.branch_storm.type_containers import MandatoryArgTypeContainer as m, OptionalArgTypeContainer as opt
 
 
@@ -143,3 +155,313 @@ def test_process_few_branches_parallel_with_initial_data(get_table_branches):
     assert exec_result is None
     actual_result = []
     table_name_result = []
+
+
+def subtract(arg1: int, arg2: int) -> int: return arg1 - arg2
+def multiply(arg1: int, arg2: int) -> int: return arg1 * arg2
+
+
+def test_shared_branch_template_concurrent_runs():
+    containers = (m(2)[int], m(1)[int], m("val.diff")[int], m[int])
+    template = br("template")[
+        op(obj(subtract)(containers[0], containers[1])).assign("val.diff"),
+        obj(return_int_one)(),
+        obj(multiply)(arg1=containers[2], arg2=containers[3]),
+    ]
+    inputs = [(num, num * 3) for num in range(200)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(template.run, inputs))
+
+    assert results == [num * 3 - num for num, _ in inputs]
+    assert all(container.par_value is Parameter.empty for container in containers[:3])
+
+
+def square_with_pid(arg: int) -> Tuple[int, int]: return arg * arg, os.getpid()
+
+
+def square_branches():
+    return [br(f"square_{num}")[obj(square_with_pid)(m[int])] for num in range(4)]
+
+
+def test_branch_pickle_round_trip(get_table_branches):
+    branch = pickle.loads(pickle.dumps(get_table_branches[0]))
+
+    assert branch.get_br_name() == "dim_pale"
+    assert branch._operations[2]._obj._method is None
+    assert branch._operations[0]._func_args_kwargs[1]["tns"].param_path.alias == "tns"
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallelize_with_result_return_executor(executor):
+    results = parallelize_with_result_return(
+        "job", square_branches(), "2", idata_for_each=((1, 2, 3, 4),), executor=executor)
+    squares, pids = zip(*results)
+
+    assert squares == (1, 4, 9, 16)
+    assert (os.getpid() in pids) is (executor == "thread")
+
+
+def add_base(arg: int, base: int) -> int: return arg + base
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallelize_executor_with_rw_inst(executor):
+    val = Values()
+    val.base = 10
+    branches = [br(f"add_{num}")[obj(add_base)(m[int], m("val.base"))].rw_inst({"val": val}) for num in range(3)]
+    results = parallelize_with_result_return("job", branches, "2", idata_for_each=((1, 2, 3),), executor=executor)
+
+    assert results == (11, 12, 13)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallelize_executor_returns_rw_inst(executor):
+    branches = [br(f"square_{num}")[
+        op(obj(square_with_pid)(m[int])).assign("val.square", "val.pid")
+    ].rw_inst({"val": Values()}) for num in range(3)]
+    results = parallelize_with_result_return("job", branches, "2", idata_for_each=((1, 2, 3),), executor=executor)
+
+    assert [val.square for val, in results] == [1, 4, 9]
+    assert all((val.pid == os.getpid()) is (executor == "thread") for val, in results)
+
+
+@pytest.mark.parametrize("threads", ["0", "-2", "many", 0, 1.5, None])
+def test_parallelize_incorrect_threads_neg(threads):
+    branches = square_branches()
+    with pytest.raises(IncorrectParameterError, match=re.escape(
+            f'The number of threads must be "max", "auto" or a positive int, passed: {threads!r}')):
+        parallelize_with_result_return("job", branches, threads, idata_for_all=1)
+
+    assert branches[0].get_br_name() == "square_0"
+    assert parallelize_with_result_return("job", square_branches(), 2, idata_for_each=((1, 2, 3, 4),))[1][0] == 4
+
+
+def test_parallelize_incorrect_executor_neg():
+    with pytest.raises(ValueError, match=re.escape(
+            'The executor "fork" is not registered. Registered executors: [\'thread\', \'process\']')):
+        parallelize_without_result("job", square_branches(), "2", executor="fork")
+
+
+class ConcurrencyCounter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current = 0
+        self.max = 0
+
+    def run(self, arg: int) -> str:
+        with self.lock:
+            self.current += 1
+            self.max = max(self.max, self.current)
+        time.sleep(0.01)
+        with self.lock:
+            self.current -= 1
+        return threading.current_thread().name
+
+
+def test_parallelize_reuses_shared_executor():
+    counter = ConcurrencyCounter()
+    branches = [br(f"br_{num}")[obj(counter).run(m[int])] for num in range(6)]
+    first_names = parallelize_with_result_return("job", branches, "2", idata_for_all=1)
+    second_names = parallelize_with_result_return("job", branches, "max", idata_for_all=1)
+
+    assert counter.max <= executor_registry.get_config("thread")[1]
+    assert len(set(first_names) | set(second_names)) <= executor_registry.get_config("thread")[1]
+    assert executor_registry.get("thread") is executor_registry.get("thread")
+
+
+def test_parallelize_limits_workers_of_call():
+    counter = ConcurrencyCounter()
+    executor_registry.configure("test_limit", "thread", 8)
+    branches = [br(f"br_{num}")[obj(counter).run(m[int])] for num in range(8)]
+    parallelize_without_result("job", branches, "3", idata_for_all=1, executor="test_limit")
+
+    assert counter.max <= 3
+
+
+def nested_parallelize(arg: int) -> Tuple:
+    return parallelize_with_result_return(
+        "nested", [br(f"in_{num}")[obj(get_int_arg_and_plus_one)(m[int])] for num in range(3)],
+        "max", idata_for_all=arg)
+
+
+def test_nested_parallelize_in_busy_executor():
+    workers = executor_registry.get_config("thread")[1]
+    branches = [br(f"out_{num}")[obj(nested_parallelize)(m[int])] for num in range(workers)]
+    results = parallelize_with_result_return("job", branches, "max", idata_for_each=(tuple(range(workers)),))
+
+    assert results == tuple((num + 1,) * 3 for num in range(workers))
+
+
+def test_executor_registry():
+    registry = ExecutorRegistry()
+    registry.configure("io", "thread", 2)
+    executor = registry.get("io")
+
+    assert registry.get("io") is executor
+    assert registry.get_config("process")[0] == "process"
+    with pytest.raises(ValueError, match='The executor "io" is already created'):
+        registry.configure("io", "thread", 4)
+    with pytest.raises(ValueError, match="The number of workers must be a positive int, passed: 0"):
+        registry.configure("cpu", "thread", 0)
+    with pytest.raises(ValueError, match='The executor kind must be "thread" or "process", passed: fiber'):
+        registry.configure("cpu", "fiber")
+    registry.shutdown()
+    assert registry.get("io") is not executor
+    registry.shutdown()
+
+
+def test_concurrency_governor():
+    governor = ConcurrencyGovernor(2)
+
+    assert governor.try_acquire() and governor.try_acquire()
+    assert not governor.try_acquire()
+    governor.release()
+    assert governor.try_acquire()
+    assert governor.used == 2
+    with pytest.raises(ValueError, match="The concurrency limit must be a positive int or None, passed: 0"):
+        governor.configure(0)
+    governor.configure(None)
+    assert governor.try_acquire()
+
+
+def wait_for_all(barrier: threading.Barrier) -> int:
+    return barrier.wait(timeout=10)
+
+
+def test_configured_executor_size_is_not_capped():
+    barrier = threading.Barrier(40)
+    executor_registry.configure("test_io", "thread", 40)
+    branches = [br(f"br_{num}")[obj(wait_for_all)(m[threading.Barrier])] for num in range(40)]
+    results = parallelize_with_result_return("job", branches, "max", idata_for_all=barrier, executor="test_io")
+
+    assert sorted(results) == list(range(40))
+
+
+def test_limit_concurrency():
+    counter = ConcurrencyCounter()
+    executor_registry.configure("test_limited_io", "thread", 16)
+    branches = [br(f"br_{num}")[obj(counter).run(m[int])] for num in range(16)]
+    executor_registry.limit_concurrency(2)
+    try:
+        parallelize_without_result("job", branches, "max", idata_for_all=1, executor="test_limited_io")
+    finally:
+        executor_registry.limit_concurrency(None)
+
+    assert counter.max <= 3
+
+
+@pytest.mark.parametrize("limit", [1, 3])
+def test_nested_parallelize_within_concurrency_limit(limit):
+    counter = ConcurrencyCounter()
+
+    def nested(arg: int) -> Tuple:
+        return parallelize_with_result_return(
+            "nested", [br(f"in_{num}")[obj(counter).run(m[int])] for num in range(4)], "max", idata_for_all=arg)
+
+    executor_registry.limit_concurrency(limit)
+    try:
+        results = parallelize_with_result_return(
+            "job", [br(f"out_{num}")[obj(nested)(m[int])] for num in range(4)], "max", idata_for_all=1)
+    finally:
+        executor_registry.limit_concurrency(None)
+
+    assert len(results) == 4 and all(len(result) == 4 for result in results)
+    assert counter.max <= limit + 1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def complete_round(controller: AimdController, clock: FakeClock, duration: float, latency: float) -> None:
+    clock.now += duration
+    for _ in range(controller.round_length):
+        controller.record(latency)
+
+
+def test_aimd_controller():
+    clock = FakeClock()
+    controller = AimdController(max_level=32, clock=clock)
+    for _ in range(5):
+        complete_round(controller, clock, 0.1, 0.1)
+
+    assert (controller.level, controller.slow_start) == (32, True)
+    complete_round(controller, clock, 0.1, 0.3)
+    assert (controller.level, controller.slow_start) == (16, False)
+    complete_round(controller, clock, 0.1, 0.1)
+    assert controller.level == 17
+    complete_round(controller, clock, 10.0, 0.1)
+    assert controller.level == 8
+    for _ in range(30):
+        complete_round(controller, clock, 0.1, 0.1)
+    assert controller.level == 32
+    assert [concurrency_round.level for concurrency_round in controller.history][:9] == \
+           [1, 2, 4, 8, 16, 32, 16, 17, 8]
+
+
+def test_aimd_controller_short_job_reaches_useful_level():
+    clock = FakeClock()
+    controller = AimdController(max_level=32, clock=clock)
+    for _ in range(30):
+        clock.now += 0.01
+        controller.record(0.1)
+
+    assert controller.level >= 16
+
+
+def test_parallelize_auto_threads(caplog):
+    caplog.set_level("INFO")
+    branches = [br(f"br_{num}")[obj(sleep_and_return)(m[int])] for num in range(30)]
+    results = parallelize_with_result_return("job", branches, "auto", idata_for_each=(tuple(range(30)),))
+
+    assert results == tuple(range(30))
+    assert "The thread executor has finished processing with auto threads, levels by rounds: [1, 2" in caplog.text
+
+
+def sleep_and_return(arg: int) -> int:
+    time.sleep(0.005)
+    return arg
+
+
+def sleep_for(seconds: float) -> float:
+    if seconds < 0:
+        raise ValueError("Negative delay")
+    time.sleep(seconds)
+    return seconds
+
+
+def test_parallelize_as_completed():
+    delays = (0.3, 0.01, 0.1, 0.02)
+    branches = [br(f"table_{num}")[obj(sleep_for)(m[float])] for num in range(4)]
+    completed = parallelize_as_completed("job", branches, "4", idata_for_each=(delays,))
+    first_name, first_result = next(completed)
+
+    assert (first_name, first_result) == ("table_1", 0.01)
+    assert list(completed) == [("table_3", 0.02), ("table_2", 0.1), ("table_0", 0.3)]
+    assert branches[0].get_br_name() == "job -> table_0"
+
+
+def test_as_completed_entry_points_yield_same_names():
+    delays = (0.02, 0.01)
+    from_parallelize = parallelize_as_completed(
+        "job", [br(f"table_{num}")[obj(sleep_for)(m[float])] for num in range(2)], "2", idata_for_each=(delays,))
+    branches = update_br_name("job", [br(f"table_{num}")[obj(sleep_for)(m[float])] for num in range(2)])
+    from_thread_pool = thread_pool_as_completed([(delay,) for delay in delays], branches, "2")
+
+    assert sorted(from_parallelize) == sorted(from_thread_pool) == [("table_0", 0.02), ("table_1", 0.01)]
+
+
+def test_parallelize_as_completed_stops_on_error():
+    delays = (0.05, -1.0, 0.01, 0.01, 0.01)
+    branches = [br(f"table_{num}")[obj(sleep_for)(m[float])] for num in range(5)]
+    names = []
+    with pytest.raises(ValueError, match="Negative delay"):
+        for name, _ in parallelize_as_completed("job", branches, "2", idata_for_each=(delays,)):
+            names.append(name)
+
+    assert names == []
@@ -1,5 +1,6 @@
 import re
 
+from src.branch_storm.utils.common import parse_attr_path
 from src.branch_storm.utils.formatters import error_formatter
 
 
@@ -39,3 +40,26 @@ def test_error_formatter_stderr_output(capsys):
                       'def def_3(): raise ValueError("Now it is Value Error!")\nNow it is Value Error!\n'
 
     assert actual_result == expected_result
+
+
+class Inner:
+    def __init__(self):
+        self.field3 = "value"
+
+
+class Outer:
+    def __init__(self):
+        self.field2 = Inner()
+
+
+def test_attr_path():
+    path = parse_attr_path("ja.field2.field3")
+    outer = Outer()
+
+    assert (path.alias, path.fields) == ("ja", ("field2", "field3"))
+    assert parse_attr_path("ja.field2.field3") is path
+    assert path.get_from(outer) == "value"
+    assert parse_attr_path("ja").get_from(outer) is outer
+    path.set_on(outer, "new")
+    assert outer.field2.field3 == "new"
+    assert parse_attr_path("ja.field2.not_exist.field").failed_field(outer) == "not_exist"